@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+from contextlib import redirect_stdout
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import argparse
+import io
+import json
+import sys
+import time
+import tracemalloc
+
+from nexus_pipeline import (
+    CSVAdapter,
+    JSONAdapter,
+    NexusManager,
+    ProcessingPipeline,
+    StreamAdapter,
+    _build_pipeline,
+)
+
+Result = Dict[str, Any]
+# A run hands back the pipeline it measured, plus its backup if one ran.
+Measured = Union[
+    None, ProcessingPipeline, Tuple[ProcessingPipeline, ProcessingPipeline]
+]
+
+
+def _temp_records(count: int) -> List[Dict[str, Any]]:
+    return [
+        {"sensor": "temp", "value": 15.0 + i % 30, "unit": "C", "meta": {}}
+        for i in range(count)
+    ]
+
+
+def _json_payloads(count: int, shape: str) -> List[str]:
+    payloads: List[str] = []
+    for i in range(count):
+        record: Dict[str, Any] = {
+            "sensor": "temp", "value": 15.0 + i % 30, "unit": "C"
+        }
+        if shape == "mixed":
+            if i % 20 == 0:
+                record["value"] = "N/A"
+            elif i % 3 == 0:
+                record = {"sensor": "humidity", "value": 40 + i % 50}
+        payloads.append(json.dumps(record))
+    return payloads
+
+
+def _csv_payload(count: int, columns: int) -> str:
+    header = ",".join(["user", "action"] + [f"c{i}" for i in range(columns)])
+    lines = [header]
+    for r in range(count):
+        cells = [f"user{r % 100}", "login"]
+        cells += [str(r * (i + 1)) for i in range(columns)]
+        lines.append(",".join(cells))
+    return "\n".join(lines) + "\n"
+
+
+def _time_run(fn: Callable[[Any], Any], records: List[Any]) -> float:
+    t0 = time.perf_counter()
+    for record in records:
+        fn(record)
+    return time.perf_counter() - t0
+
+
+def _measure(
+    name: str,
+    count: int,
+    setup: Callable[[], Any],
+    run: Callable[[Any], Measured],
+    repeat: int,
+) -> Result:
+    best = float("inf")
+    stage_time: Dict[str, float] = {}
+    backup_time: Dict[str, float] = {}
+    for _ in range(repeat):
+        state = setup()
+        t0 = time.perf_counter()
+        measured = run(state)
+        elapsed = time.perf_counter() - t0
+        if elapsed < best:
+            best = elapsed
+            pipeline, backup = (
+                measured if isinstance(measured, tuple) else (measured, None)
+            )
+            stage_time = dict(pipeline.stage_time) if pipeline else {}
+            backup_time = dict(backup.stage_time) if backup else {}
+
+    # Peak memory gets its own run: tracemalloc slows the timed ones.
+    state = setup()
+    tracemalloc.start()
+    run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "workload": name,
+        "records": count,
+        "seconds": best,
+        "records_per_s": count / best if best else 0.0,
+        "stage_time_s": stage_time,
+        "backup_stage_time_s": backup_time,
+        "peak_mem_bytes": peak,
+    }
+
+
+def _new_pipeline(cls: type, pipeline_id: str) -> Any:
+    pipeline = cls(pipeline_id)
+    _build_pipeline(pipeline)
+    return pipeline
+
+
+def _json_id(safe_mode: bool) -> str:
+    # The _BACKUP suffix is what switches a pipeline to safe mode, where
+    # bad readings are annotated instead of raising.
+    return "BENCH_JSON_BACKUP" if safe_mode else "BENCH_JSON"
+
+
+def bench_json(
+    count: int,
+    shape: str,
+    repeat: int,
+    safe_mode: bool = False,
+) -> Result:
+    def run(payloads: List[str]) -> ProcessingPipeline:
+        pipeline = _new_pipeline(JSONAdapter, _json_id(safe_mode))
+        for payload in payloads:
+            try:
+                pipeline.process(payload)
+            except RuntimeError:
+                pass
+        return pipeline
+
+    return _measure(
+        "json", count, lambda: _json_payloads(count, shape), run, repeat
+    )
+
+
+def bench_json_batch(
+    count: int,
+    shape: str,
+    repeat: int,
+    batch_size: int = 512,
+    safe_mode: bool = False,
+) -> Result:
+    def run(payloads: List[str]) -> ProcessingPipeline:
+        pipeline = _new_pipeline(JSONAdapter, _json_id(safe_mode))
+        for i in range(0, len(payloads), batch_size):
+            pipeline.process_batch(payloads[i:i + batch_size])
+        return pipeline
+
+    return _measure(
+        "json_batch", count, lambda: _json_payloads(count, shape), run, repeat
+    )
+
+
+def bench_csv(count: int, columns: int, repeat: int) -> Result:
+    def run(payload: str) -> ProcessingPipeline:
+        pipeline = _new_pipeline(CSVAdapter, "BENCH_CSV")
+        pipeline.process(payload)
+        return pipeline
+
+    return _measure(
+        "csv", count, lambda: _csv_payload(count, columns), run, repeat
+    )
+
+
+def bench_csv_typed(count: int, columns: int, repeat: int) -> Result:
+    def run(payload: str) -> ProcessingPipeline:
+        pipeline = _new_pipeline(CSVAdapter, "BENCH_CSV")
+        pipeline.process_typed(iter(payload.splitlines(keepends=True)))
+        return pipeline
+
+    return _measure(
+        "csv_typed", count, lambda: _csv_payload(count, columns), run, repeat
+    )
+
+
+def bench_stream(count: int, repeat: int) -> Result:
+    def run(_: Any) -> ProcessingPipeline:
+        pipeline = _new_pipeline(StreamAdapter, "BENCH_STREAM")
+        pipeline.summarize(
+            {"value": 20.0 + i % 10} for i in range(count)
+        )
+        return pipeline
+
+    return _measure("stream", count, lambda: None, run, repeat)
+
+
+def bench_chain(count: int, shape: str, repeat: int) -> Result:
+    def setup() -> List[Dict[str, Any]]:
+        return [json.loads(p) for p in _json_payloads(count, shape)]
+
+    def run(
+        records: List[Dict[str, Any]],
+    ) -> Tuple[ProcessingPipeline, ProcessingPipeline]:
+        manager = NexusManager()
+        pipeline = _new_pipeline(JSONAdapter, "BENCH_CHAIN")
+        backup = _new_pipeline(JSONAdapter, "BENCH_CHAIN_BACKUP")
+        manager.register(pipeline)
+        manager.register_backup("BENCH_CHAIN", backup)
+        ids = ["BENCH_CHAIN"] * 3
+        # Failover prints a notice per record; keep it out of the report.
+        with redirect_stdout(io.StringIO()):
+            for record in records:
+                try:
+                    manager.chain(ids, record)
+                except RuntimeError:
+                    pass
+        # The backup's stages are reported on their own line set.
+        return pipeline, backup
+
+    return _measure("chain", count, setup, run, repeat)
+
+
+def bench_compile(count: int = 200_000, repeat: int = 3) -> Dict[str, float]:
+    pipeline = JSONAdapter("BENCH_PIPE")
+    _build_pipeline(pipeline)
+    fused = pipeline.compile("temp")
+
+    # Stages mutate their input, so every run gets fresh records.
+    staged = min(
+        _time_run(pipeline._run_stages, _temp_records(count))
+        for _ in range(repeat)
+    )
+    compiled = min(
+        _time_run(fused, _temp_records(count)) for _ in range(repeat)
+    )
+    return {
+        "records": count,
+        "run_stages_s": staged,
+        "compiled_s": compiled,
+        "speedup": staged / compiled if compiled else 0.0,
+    }
+
+
+def run_suite(
+    count: int,
+    shape: str,
+    csv_columns: int,
+    repeat: int,
+    safe_mode: bool = False,
+) -> Dict[str, Result]:
+    results = [
+        bench_json(count, shape, repeat, safe_mode),
+        bench_json_batch(count, shape, repeat, safe_mode=safe_mode),
+        bench_csv(count, csv_columns, repeat),
+        bench_csv_typed(count, csv_columns, repeat),
+        bench_stream(count, repeat),
+        bench_chain(count, shape, repeat),
+    ]
+    return {result["workload"]: result for result in results}
+
+
+def compare(
+    results: Dict[str, Result],
+    baseline: Dict[str, Result],
+    tolerance: float,
+) -> List[str]:
+    regressions: List[str] = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or not base.get("records_per_s"):
+            continue
+        change = result["records_per_s"] / base["records_per_s"] - 1.0
+        marker = ""
+        if change < -tolerance:
+            marker = "  <-- REGRESSION"
+            regressions.append(name)
+        print(f"{name:<12} {change:+7.1%} vs baseline{marker}")
+    return regressions
+
+
+def _print_results(results: Dict[str, Result]) -> None:
+    print(f"{'workload':<12} {'records/s':>12} {'seconds':>9} {'peak MB':>9}")
+    for name, result in results.items():
+        print(
+            f"{name:<12} {result['records_per_s']:>12,.0f} "
+            f"{result['seconds']:>9.3f} "
+            f"{result['peak_mem_bytes'] / 1e6:>9.2f}"
+        )
+        for stage, seconds in result["stage_time_s"].items():
+            print(f"    {stage:<24} {seconds:.4f}s")
+        for stage, seconds in result.get("backup_stage_time_s", {}).items():
+            print(f"    {'backup.' + stage:<24} {seconds:.4f}s")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Nexus pipeline benchmarks")
+    parser.add_argument("--records", type=int, default=20_000)
+    parser.add_argument(
+        "--shape", choices=("temp", "mixed"), default="temp"
+    )
+    parser.add_argument(
+        "--safe-mode",
+        action="store_true",
+        help="run the JSON workloads in safe mode: with --shape mixed, bad "
+        "readings are annotated instead of taking the error path",
+    )
+    parser.add_argument("--csv-columns", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", metavar="PATH", help="write a baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="compare to it")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--compile", action="store_true")
+    args = parser.parse_args(argv)
+
+    print("=== CODE NEXUS - PIPELINE BENCHMARKS ===\n")
+    if args.compile:
+        result = bench_compile(args.records, args.repeat)
+        print(f"Records: {result['records']}")
+        print(f"_run_stages: {result['run_stages_s']:.3f}s")
+        print(f"compile('temp'): {result['compiled_s']:.3f}s")
+        print(f"Speedup: {result['speedup']:.2f}x")
+        return 0
+
+    results = run_suite(
+        args.records, args.shape, args.csv_columns, args.repeat,
+        args.safe_mode,
+    )
+    _print_results(results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print()
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
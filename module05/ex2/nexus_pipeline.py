@@ -1,12 +1,51 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from collections import Counter, defaultdict
-from typing import Any, Dict, List, Protocol, Union, runtime_checkable
+from array import array
+from collections import Counter, OrderedDict, defaultdict, deque
+from collections.abc import Iterator, Mapping
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import closing, contextmanager
+from itertools import islice
+from multiprocessing import shared_memory
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Set,
+    TextIO,
+    Tuple,
+    Union,
+    runtime_checkable,
+)
+import asyncio
+import base64
+import bisect
+import copy
 import csv
+import hashlib
 import io
 import json
+import math
+import mmap
+import multiprocessing
+import os
+import queue
+import re
+import sqlite3
+import struct
+import tempfile
+import threading
 import time
+import weakref
 
 
 @runtime_checkable
@@ -15,6 +54,280 @@ class ProcessingStage(Protocol):
         ...
 
 
+@runtime_checkable
+class BatchProcessingStage(ProcessingStage, Protocol):
+    # Failed items are returned as Exception instances in their slot.
+    def process_batch(self, batch: List[Any]) -> List[Any]:
+        ...
+
+
+class _Dropped:
+    def __repr__(self) -> str:
+        return "DROPPED"
+
+    def __reduce__(self) -> str:
+        # Unpickles to the module-level singleton, so `is` keeps working.
+        return "DROPPED"
+
+
+# Returned by filter stages; the pipeline stops processing the record.
+DROPPED = _Dropped()
+
+
+def _stage_name(stage: ProcessingStage) -> str:
+    return getattr(stage, "stage_name", None) or stage.__class__.__name__
+
+
+def _process_each(stage: ProcessingStage, batch: List[Any]) -> List[Any]:
+    process = stage.process
+    out: List[Any] = []
+    for item in batch:
+        try:
+            out.append(process(item))
+        except Exception as exc:
+            out.append(exc)
+    return out
+
+
+class OnlineAggregator:
+    __slots__ = ("count", "mean", "_m2", "min", "max")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def update(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: OnlineAggregator) -> None:
+        if not other.count:
+            return
+        if not self.count:
+            self.count = other.count
+            self.mean = other.mean
+            self._m2 = other._m2
+            self.min = other.min
+            self.max = other.max
+            return
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        weight = self.count * other.count / total
+        self._m2 += other._m2 + delta * delta * weight
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.count if self.count else 0.0
+
+    def get_state(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self._m2,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    def set_state(self, state: Dict[str, float]) -> None:
+        self.count = int(state["count"])
+        self.mean = float(state["mean"])
+        self._m2 = float(state["m2"])
+        self.min = float(state["min"])
+        self.max = float(state["max"])
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "avg": self.mean,
+            "variance": self.variance,
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+class ColumnarBatch:
+    STATUSES = (
+        "",
+        "Normal range",
+        "Out of range",
+        "Invalid data format",
+        "Enriched with metadata",
+    )
+    NONE, NORMAL, OUT_OF_RANGE, INVALID, ENRICHED = range(len(STATUSES))
+
+    def __init__(self) -> None:
+        self.sensor = array("I")
+        self.value = array("d")
+        self.unit = array("I")
+        self.status = array("B")
+        self.sensor_names: List[str] = []
+        self.unit_names: List[str] = []
+        self._sensor_codes: Dict[str, int] = {}
+        self._unit_codes: Dict[str, int] = {}
+        self.timestamp: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    @staticmethod
+    def _encode(name: str, names: List[str], codes: Dict[str, int]) -> int:
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(names)
+            names.append(name)
+        return code
+
+    def sensor_code(self, name: str) -> int:
+        return self._encode(name, self.sensor_names, self._sensor_codes)
+
+    def unit_code(self, name: str) -> int:
+        return self._encode(name, self.unit_names, self._unit_codes)
+
+    def append(self, sensor: str, value: Any, unit: str = "C") -> None:
+        try:
+            reading = float(value)
+        except (TypeError, ValueError):
+            reading = math.nan
+        self.sensor.append(self.sensor_code(sensor))
+        self.value.append(reading)
+        self.unit.append(self.unit_code(unit))
+        self.status.append(self.NONE)
+
+    def columns(self) -> Dict[str, memoryview]:
+        return {
+            "sensor": memoryview(self.sensor),
+            "value": memoryview(self.value),
+            "unit": memoryview(self.unit),
+            "status": memoryview(self.status),
+        }
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[Dict[str, Any]],
+    ) -> ColumnarBatch:
+        batch = cls()
+        for record in records:
+            batch.append(
+                str(record.get("sensor", "")),
+                record.get("value"),
+                str(record.get("unit", "C")),
+            )
+        return batch
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        records: List[Dict[str, Any]] = []
+        sensors = self.sensor_names
+        units = self.unit_names
+        for code, value, unit_code, status in zip(
+            self.sensor, self.value, self.unit, self.status
+        ):
+            unit = units[unit_code]
+            record: Dict[str, Any] = {
+                "sensor": sensors[code],
+                "value": value,
+                "unit": unit,
+                "meta": {},
+            }
+            if self.timestamp is not None:
+                record["meta"]["timestamp"] = self.timestamp
+            if status != self.NONE:
+                analysis = {"status": self.STATUSES[status]}
+                if record["sensor"] == "temp":
+                    analysis["reading"] = (
+                        "N/A" if value != value else f"{value}°{unit}"
+                    )
+                record["analysis"] = analysis
+            records.append(record)
+        return records
+
+
+class Clock(Protocol):
+    def now(self) -> float:
+        ...
+
+
+class SystemClock:
+    def now(self) -> float:
+        return time.time()
+
+
+class BatchClock:
+    # Frozen while a batch run holds it, so a batch shares one timestamp;
+    # per-record runs read through to the source.
+    def __init__(self, source: Callable[[], float] = time.time) -> None:
+        self._source = source
+        self._now = source()
+        self._held = False
+
+    def now(self) -> float:
+        return self._now if self._held else self._source()
+
+    def tick(self) -> None:
+        self._now = self._source()
+
+    def hold(self) -> None:
+        self.tick()
+        self._held = True
+
+    def release(self) -> None:
+        self._held = False
+
+
+class CoarseClock:
+    # A daemon thread refreshes the cached time once per resolution_s,
+    # so readers never hit the system clock.
+    def __init__(self, resolution_s: float = 0.001) -> None:
+        if resolution_s <= 0:
+            raise ValueError("resolution_s must be > 0")
+        self.resolution_s = resolution_s
+        self._start()
+
+    def _start(self) -> None:
+        self._now = time.time()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __getstate__(self) -> Dict[str, float]:
+        # Threads don't pickle; a copy (e.g. in a spawned worker) gets its
+        # own refresher.
+        return {"resolution_s": self.resolution_s}
+
+    def __setstate__(self, state: Dict[str, float]) -> None:
+        self.resolution_s = state["resolution_s"]
+        self._start()
+
+    def now(self) -> float:
+        return self._now
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.resolution_s):
+            self._now = time.time()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
 class InputStage:
     def process(self, data: Any) -> Any:
         if data is None:
@@ -28,7 +341,7 @@ class InputStage:
                 raise TypeError("InputStage: meta must be a dict")
             return data
 
-        if isinstance(data, list):
+        if isinstance(data, (list, Iterator, ColumnarBatch)):
             return data
 
         if isinstance(data, str) and data.strip():
@@ -36,15 +349,49 @@ class InputStage:
 
         raise TypeError(f"InputStage: unsupported type: {type(data)}")
 
+    def process_batch(self, batch: List[Any]) -> List[Any]:
+        return _process_each(self, batch)
+
 
 class TransformStage:
+    def __init__(self, clock: Optional[Clock] = None) -> None:
+        self.clock: Clock = clock if clock is not None else SystemClock()
+
+    def process_columnar(self, batch: ColumnarBatch) -> ColumnarBatch:
+        temp = batch.sensor_code("temp")
+        celsius = batch.unit_code("C")
+        status = batch.status
+        for i, (code, value, unit) in enumerate(
+            zip(batch.sensor, batch.value, batch.unit)
+        ):
+            if value != value:
+                status[i] = batch.INVALID
+            elif code != temp:
+                status[i] = batch.ENRICHED
+            elif unit == celsius and (value < 0.0 or value > 35.0):
+                status[i] = batch.OUT_OF_RANGE
+            else:
+                status[i] = batch.NORMAL
+        batch.timestamp = self.clock.now()
+        return batch
+
+    def restamp(self, data: Any) -> Any:
+        # Everything else this stage writes depends only on the record, so
+        # a cached result is brought up to date by refreshing the clock.
+        if isinstance(data, dict) and isinstance(data.get("meta"), dict):
+            data["meta"]["timestamp"] = self.clock.now()
+        return data
+
     def process(self, data: Any) -> Any:
+        if isinstance(data, ColumnarBatch):
+            return self.process_columnar(data)
+
         if isinstance(data, dict):
             meta = data.setdefault("meta", {})
             safe = bool(meta.get("safe_mode", False))
 
             if data.get("type") == "csv":
-                meta["timestamp"] = time.time()
+                meta["timestamp"] = self.clock.now()
                 data.setdefault("analysis", {})
                 data["analysis"].setdefault("status", "CSV parsed")
                 return data
@@ -57,7 +404,7 @@ class TransformStage:
                         data.setdefault("analysis", {})
                         data["analysis"]["reading"] = "N/A"
                         data["analysis"]["status"] = "Invalid data format"
-                        meta["timestamp"] = time.time()
+                        meta["timestamp"] = self.clock.now()
                         return data
                     raise ValueError("Invalid data format")
 
@@ -66,7 +413,7 @@ class TransformStage:
                 if unit == "C" and (value < 0.0 or value > 35.0):
                     status = "Out of range"
 
-                meta["timestamp"] = time.time()
+                meta["timestamp"] = self.clock.now()
                 data["analysis"] = {
                     "reading": f"{value}°{unit}",
                     "status": status,
@@ -78,48 +425,168 @@ class TransformStage:
                     _ = float(data.get("value"))
                 except (TypeError, ValueError):
                     if safe:
-                        meta["timestamp"] = time.time()
+                        meta["timestamp"] = self.clock.now()
                         data.setdefault("analysis", {})
                         data["analysis"]["status"] = "Invalid value"
                         return data
                     raise ValueError("Invalid data format")
 
-            meta["timestamp"] = time.time()
+            meta["timestamp"] = self.clock.now()
             data["analysis"] = data.get("analysis", {})
             data["analysis"].setdefault("status", "Enriched with metadata")
             return data
 
-        if isinstance(data, list):
-            if not data:
-                return {"analysis": {"summary": "Empty stream"}, "final": True}
-
-            nums: List[float] = []
+        if isinstance(data, (list, Iterator)):
+            agg = OnlineAggregator()
+            seen = False
             for item in data:
+                seen = True
                 if isinstance(item, (int, float)):
-                    nums.append(float(item))
+                    agg.add(float(item))
                     continue
 
                 if isinstance(item, dict) and "value" in item:
                     try:
-                        nums.append(float(item["value"]))
+                        agg.add(float(item["value"]))
                     except (TypeError, ValueError):
                         # ignora item inválido na agregação
                         continue
 
-            if not nums:
+            if not seen:
+                return {"analysis": {"summary": "Empty stream"}, "final": True}
+
+            if not agg.count:
                 raise ValueError("TransformStage: no numeric values to aggregate") # noqa
 
-            avg_val = sum(nums) / len(nums)
-            return {
-                "analysis": {
-                    "count": len(nums),
-                    "avg": avg_val,
-                },
-                "final": True,
-            }
+            return {"analysis": agg.summary(), "final": True}
 
         raise TypeError(f"TransformStage: unsupported type: {type(data)}")
 
+    def process_batch(self, batch: List[Any]) -> List[Any]:
+        return _process_each(self, batch)
+
+
+class FilterStage:
+    def __init__(
+        self,
+        predicate: Callable[[Any], bool],
+        name: Optional[str] = None,
+    ) -> None:
+        self.predicate = predicate
+        label = name or getattr(predicate, "__name__", "predicate")
+        self.stage_name = f"FilterStage[{label}]"
+
+    def process(self, data: Any) -> Any:
+        return data if self.predicate(data) else DROPPED
+
+    def process_batch(self, batch: List[Any]) -> List[Any]:
+        return _process_each(self, batch)
+
+
+class EWMAAnomalyStage:
+    # Per-sensor EWMA mean/variance in parallel arrays: O(1) state each.
+    stage_name = "EWMAAnomalyStage"
+
+    def __init__(
+        self,
+        alpha: float = 0.05,
+        threshold_z: float = 3.0,
+        warmup: int = 30,
+        key: str = "device",
+        sensor: Optional[str] = "temp",
+    ) -> None:
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha must be in (0, 1]")
+        if threshold_z <= 0.0:
+            raise ValueError("threshold_z must be > 0")
+        self.alpha = alpha
+        self.threshold_z = threshold_z
+        self.warmup = warmup
+        self.key = key
+        self.sensor = sensor
+        self.index: Dict[str, int] = {}
+        self.mean = array("d")
+        self.var = array("d")
+        self.count = array("I")
+        self.anomalies = 0
+
+    def _slot(self, name: str) -> int:
+        slot = self.index.get(name)
+        if slot is None:
+            slot = self.index[name] = len(self.mean)
+            self.mean.append(0.0)
+            self.var.append(0.0)
+            self.count.append(0)
+        return slot
+
+    def score(self, name: str, value: float) -> Optional[float]:
+        slot = self._slot(name)
+        n = self.count[slot]
+        mean = self.mean[slot]
+        var = self.var[slot]
+        if n == 0:
+            self.mean[slot] = value
+            self.count[slot] = 1
+            return None
+
+        # Score against the state before this reading, then fold it in.
+        diff = value - mean
+        z = None
+        if n >= self.warmup:
+            z = diff / math.sqrt(var) if var > 0.0 else 0.0
+        incr = self.alpha * diff
+        self.mean[slot] = mean + incr
+        self.var[slot] = (1.0 - self.alpha) * (var + diff * incr)
+        self.count[slot] = n + 1
+        return z
+
+    def process(self, data: Any) -> Any:
+        if not isinstance(data, dict):
+            return data
+        if self.sensor is not None and data.get("sensor") != self.sensor:
+            return data
+        raw = data.get("value")
+        if raw is None:
+            return data
+        try:
+            value = float(raw)
+        except (TypeError, ValueError):
+            return data
+        if value != value:
+            return data
+
+        meta = data.get("meta") or {}
+        name = data.get(self.key) or meta.get(self.key) or data.get("sensor")
+        z = self.score(str(name), value)
+        if z is None:
+            return data
+
+        anomaly = abs(z) > self.threshold_z
+        self.anomalies += anomaly
+        analysis = data.setdefault("analysis", {})
+        analysis["zscore"] = round(z, 3)
+        analysis["anomaly"] = anomaly
+        return data
+
+    def process_batch(self, batch: List[Any]) -> List[Any]:
+        return _process_each(self, batch)
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "index": dict(self.index),
+            "mean": self.mean.tolist(),
+            "var": self.var.tolist(),
+            "count": self.count.tolist(),
+            "anomalies": self.anomalies,
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self.index = {str(k): int(v) for k, v in state["index"].items()}
+        self.mean = array("d", state["mean"])
+        self.var = array("d", state["var"])
+        self.count = array("I", state["count"])
+        self.anomalies = int(state.get("anomalies", 0))
+
 
 class OutputStage:
     def process(self, data: Any) -> Any:
@@ -146,110 +613,1240 @@ class OutputStage:
         if isinstance(data, list):
             return f"Output list: {len(data)} items"
 
+        if isinstance(data, ColumnarBatch):
+            flagged = data.status.count(data.OUT_OF_RANGE)
+            invalid = data.status.count(data.INVALID)
+            return (
+                f"Columnar batch: {len(data)} readings "
+                f"({flagged} out of range, {invalid} invalid)"
+            )
+
         return f"Output: {data}"
 
+    def process_batch(self, batch: List[Any]) -> List[Any]:
+        return _process_each(self, batch)
+
+
+def _fuse_temp_chain(
+    fallback: Callable[[Any], Any],
+    stages: List[ProcessingStage],
+) -> Callable[[Any], Any]:
+    transform = stages[1]
+    if not isinstance(transform, TransformStage):
+        return fallback
+    now = transform.clock.now
+
+    def fused(data: Any) -> Any:
+        if (
+            type(data) is not dict
+            or data.get("sensor") != "temp"
+            or data.get("type") == "csv"
+        ):
+            return fallback(data)
+
+        meta = data.get("meta")
+        if meta is None:
+            meta = data["meta"] = {}
+        elif type(meta) is not dict:
+            return fallback(data)
+
+        raw = data.get("value")
+        if raw is None:
+            return fallback(data)
+        try:
+            value = float(raw)
+        except (TypeError, ValueError):
+            # Safe mode and error reporting live in the generic chain.
+            return fallback(data)
+
+        unit = str(data.get("unit", "C"))
+        status = "Normal range"
+        if unit == "C" and (value < 0.0 or value > 35.0):
+            status = "Out of range"
+
+        meta["timestamp"] = now()
+        reading = f"{value}°{unit}"
+        data["analysis"] = {"reading": reading, "status": status}
+        if meta.get("chaining") is True:
+            return data
+        return f"Processed temperature reading: {reading} ({status})"
+
+    return fused
+
+
+_Fuser = Callable[
+    [Callable[[Any], Any], List[ProcessingStage]], Callable[[Any], Any]
+]
+_FUSERS: Dict[str, _Fuser] = {
+    "temp": _fuse_temp_chain,
+}
+
+
+class LatencyHistogram:
+    # Log-linear buckets over nanoseconds: exact below 16ns, then eight
+    # sub-buckets per power of two (at most 12.5% relative error).
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @staticmethod
+    def _index(ns: int) -> int:
+        if ns < 16:
+            return ns if ns > 0 else 0
+        shift = ns.bit_length() - 4
+        return (shift << 3) + (ns >> shift)
+
+    @staticmethod
+    def _upper_ns(index: int) -> int:
+        if index < 16:
+            return index
+        shift = (index >> 3) - 1
+        return (((index & 7) + 9) << shift) - 1
+
+    def record(self, seconds: float, count: int = 1) -> None:
+        index = self._index(int(seconds * 1e9))
+        self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += count
+        self.total += seconds * count
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: LatencyHistogram) -> None:
+        for index, hits in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + hits
+        self.count += other.count
+        self.total += other.total
+        if other.max > self.max:
+            self.max = other.max
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= target:
+                return min(self._upper_ns(index) / 1e9, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_s": self.total / self.count if self.count else 0.0,
+            "p50_s": self.percentile(0.50),
+            "p90_s": self.percentile(0.90),
+            "p99_s": self.percentile(0.99),
+            "max_s": self.max,
+        }
+
+    def reset(self) -> None:
+        self.buckets.clear()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "buckets": {str(k): v for k, v in self.buckets.items()},
+            "count": self.count,
+            "total": self.total,
+            "max": self.max,
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self.buckets = {int(k): int(v) for k, v in state["buckets"].items()}
+        self.count = int(state["count"])
+        self.total = float(state["total"])
+        self.max = float(state["max"])
+
+
+class Checkpoint:
+    # Atomic JSON snapshot of a stream position plus aggregate state.
+    def __init__(
+        self,
+        path: Union[str, os.PathLike[str]],
+        every: int = 10_000,
+    ) -> None:
+        if every < 1:
+            raise ValueError("every must be >= 1")
+        self.path = path
+        self.every = every
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, state: Dict[str, Any]) -> None:
+        tmp_path = f"{os.fspath(self.path)}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _tag_stage(exc: BaseException, stage_name: str) -> None:
+    if getattr(exc, "nexus_stage", None) is None:
+        setattr(exc, "nexus_stage", stage_name)
+
+
+def _failed_stage(exc: Optional[BaseException]) -> Optional[str]:
+    while exc is not None:
+        stage = getattr(exc, "nexus_stage", None)
+        if stage is not None:
+            return stage
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+class StageInfo:
+    __slots__ = ("pure", "is_filter", "selectivity")
+
+    def __init__(
+        self,
+        pure: bool = False,
+        is_filter: bool = False,
+        selectivity: float = 1.0,
+    ) -> None:
+        if not 0.0 <= selectivity <= 1.0:
+            raise ValueError("selectivity must be within [0, 1]")
+        self.pure = pure
+        self.is_filter = is_filter
+        self.selectivity = selectivity
+
 
 class ProcessingPipeline(ABC):
-    def __init__(self, pipeline_id: str) -> None:
+    def __init__(self, pipeline_id: str, timing_sample: int = 1) -> None:
+        if timing_sample < 1:
+            raise ValueError("timing_sample must be >= 1")
         self.pipeline_id = pipeline_id
+        # Time one run in every timing_sample; counts are scaled back up.
+        self.timing_sample = timing_sample
+        self._runs = 0
         self.stages: List[ProcessingStage] = []
+        self.stage_info: List[StageInfo] = []
+        self.stage_drops: Counter[str] = Counter()
+        self.last_plan: List[Dict[str, Any]] = []
         self.stats: Counter[str] = Counter()
         self.stage_time: Dict[str, float] = defaultdict(float)
-
-    def add_stage(self, stage: ProcessingStage) -> None:
+        self.stage_latency: Dict[str, LatencyHistogram] = defaultdict(
+            LatencyHistogram
+        )
+
+    def add_stage(
+        self,
+        stage: ProcessingStage,
+        pure: bool = False,
+        is_filter: bool = False,
+        selectivity: float = 1.0,
+    ) -> None:
         if not isinstance(stage, ProcessingStage):
             raise TypeError("Stage must implement process(self, data)")
+        self.stage_info.append(StageInfo(pure, is_filter, selectivity))
         self.stages.append(stage)
 
-    def _run_stages(self, data: Any) -> Any:
+    def optimize(self, min_samples: int = 100) -> List[Dict[str, Any]]:
+        # Pure stages between two impure ones commute, so each such run is
+        # reordered by rank = cost / (1 - selectivity): cheap, selective
+        # filters first, non-filters (rank inf) after them in their order.
+        entries = []
+        for stage, info in zip(self.stages, self.stage_info):
+            name = _stage_name(stage)
+            hist = self.stage_latency.get(name)
+            calls = hist.count if hist is not None else 0
+            cost = self.stage_time.get(name, 0.0) / calls if calls else 0.0
+            selectivity = info.selectivity
+            if info.is_filter and calls >= min_samples:
+                selectivity = 1.0 - self.stage_drops[name] / calls
+            rank = math.inf
+            if info.is_filter and selectivity < 1.0:
+                rank = cost / (1.0 - selectivity)
+            entries.append((stage, info, name, cost, selectivity, rank))
+
+        ordered: List[Any] = []
+        segment: List[Any] = []
+        for entry in entries:
+            if entry[1].pure:
+                segment.append(entry)
+                continue
+            ordered.extend(sorted(segment, key=lambda e: e[5]))
+            segment = []
+            ordered.append(entry)
+        ordered.extend(sorted(segment, key=lambda e: e[5]))
+
+        self.stages = [entry[0] for entry in ordered]
+        self.stage_info = [entry[1] for entry in ordered]
+        self.last_plan = [
+            {
+                "stage": name,
+                "pure": info.pure,
+                "filter": info.is_filter,
+                "selectivity": selectivity,
+                "cost_s": cost,
+                "rank": rank,
+            }
+            for _, info, name, cost, selectivity, rank in ordered
+        ]
+        return self.last_plan
+
+    def _run_stages(
+        self,
+        data: Any,
+        stages: Optional[List[ProcessingStage]] = None,
+    ) -> Any:
         current = data
-        for stage in self.stages:
-            stage_name = stage.__class__.__name__
+        sample = self.timing_sample
+        self._runs += 1
+        if sample > 1 and self._runs % sample:
+            for stage in self.stages if stages is None else stages:
+                try:
+                    current = stage.process(current)
+                except Exception as exc:
+                    _tag_stage(exc, _stage_name(stage))
+                    raise
+                if current is DROPPED:
+                    # Drops are counted on every run, so never scaled.
+                    self.stage_drops[_stage_name(stage)] += 1
+                    break
+            return current
+
+        for stage in self.stages if stages is None else stages:
+            stage_name = _stage_name(stage)
             t0 = time.perf_counter()
-            current = stage.process(current)
-            self.stage_time[stage_name] += time.perf_counter() - t0
+            try:
+                current = stage.process(current)
+            except Exception as exc:
+                _tag_stage(exc, stage_name)
+                raise
+            elapsed = time.perf_counter() - t0
+            self.stage_time[stage_name] += elapsed * sample
+            self.stage_latency[stage_name].record(elapsed, sample)
+            if current is DROPPED:
+                self.stage_drops[stage_name] += 1
+                break
         return current
 
-    def get_stats(self) -> Dict[str, Union[str, int, float, Dict[str, float]]]:
+    def compile(self, shape: Optional[str] = None) -> Callable[[Any], Any]:
+        processes = tuple(stage.process for stage in self.stages)
+
+        def run_chain(data: Any) -> Any:
+            for process in processes:
+                data = process(data)
+                if data is DROPPED:
+                    break
+            return data
+
+        if shape is None:
+            return run_chain
+        if shape not in _FUSERS:
+            raise ValueError(f"Unknown input shape: {shape}")
+
+        # Specialised fusers only know the built-in stage chain.
+        kinds = [type(stage) for stage in self.stages]
+        if kinds != [InputStage, TransformStage, OutputStage]:
+            return run_chain
+        return _FUSERS[shape](run_chain, list(self.stages))
+
+    def _run_stages_batch(self, batch: List[Any]) -> List[Any]:
+        clocks: List[BatchClock] = []
+        for stage in self.stages:
+            clock = getattr(stage, "clock", None)
+            if isinstance(clock, BatchClock):
+                clocks.append(clock)
+        for clock in clocks:
+            clock.hold()
+        try:
+            return self._run_batch(batch)
+        finally:
+            for clock in clocks:
+                clock.release()
+
+    def _run_batch(self, batch: List[Any]) -> List[Any]:
+        results = list(batch)
+        live = [
+            i for i, item in enumerate(results)
+            if not isinstance(item, Exception)
+        ]
+        for stage in self.stages:
+            if not live:
+                break
+            items = [results[i] for i in live]
+            stage_name = _stage_name(stage)
+            t0 = time.perf_counter()
+            if isinstance(stage, BatchProcessingStage):
+                out = stage.process_batch(items)
+            else:
+                out = _process_each(stage, items)
+            elapsed = time.perf_counter() - t0
+            self.stage_time[stage_name] += elapsed
+            # One clock read per batch: spread it evenly over the records.
+            self.stage_latency[stage_name].record(
+                elapsed / len(items), len(items)
+            )
+
+            if len(out) != len(items):
+                raise ValueError(
+                    f"{stage_name}: process_batch returned {len(out)} "
+                    f"results for {len(items)} records"
+                )
+
+            survivors: List[int] = []
+            for i, value in zip(live, out):
+                results[i] = value
+                if isinstance(value, Exception):
+                    _tag_stage(value, stage_name)
+                elif value is DROPPED:
+                    self.stage_drops[stage_name] += 1
+                else:
+                    survivors.append(i)
+            live = survivors
+        return results
+
+    def _prepare(self, data: Any) -> Any:
+        return data
+
+    def process_batch(self, records: Iterable[Any]) -> List[Any]:
+        prepared: List[Any] = []
+        for record in records:
+            try:
+                prepared.append(self._prepare(record))
+            except Exception as exc:
+                prepared.append(exc)
+
+        name = self.__class__.__name__
+        out: List[Any] = []
+        for value in self._run_stages_batch(prepared):
+            if isinstance(value, Exception):
+                self.stats["errors"] += 1
+                err = RuntimeError(f"{name} failed: {value}")
+                err.__cause__ = value
+                out.append(err)
+            else:
+                self.stats["processed"] += 1
+                out.append(value)
+        return out
+
+    def get_stats(self, reset_latency: bool = False) -> Dict[str, Any]:
         processed = int(self.stats.get("processed", 0))
         errors = int(self.stats.get("errors", 0))
         total = processed + errors
         efficiency = (processed / total) if total else 1.0
+        latency = {
+            name: hist.snapshot() for name, hist in self.stage_latency.items()
+        }
+        if reset_latency:
+            self.stage_latency.clear()
         return {
             "pipeline_id": self.pipeline_id,
             "processed": processed,
             "errors": errors,
             "efficiency": efficiency,
             "stage_time_s": dict(self.stage_time),
+            "stage_latency": latency,
+            "dropped": dict(self.stage_drops),
+            "plan": list(self.last_plan),
         }
 
+    def merge_stats(
+        self,
+        stats: Dict[str, int],
+        stage_time: Dict[str, float],
+        stage_latency: Optional[Dict[str, LatencyHistogram]] = None,
+    ) -> None:
+        self.stats.update(stats)
+        for name, seconds in stage_time.items():
+            self.stage_time[name] += seconds
+        for name, hist in (stage_latency or {}).items():
+            self.stage_latency[name].merge(hist)
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {
+            "stats": dict(self.stats),
+            "stage_time": dict(self.stage_time),
+            "stage_drops": dict(self.stage_drops),
+            "stage_latency": {
+                name: hist.get_state()
+                for name, hist in self.stage_latency.items()
+            },
+            "stages": {
+                str(i): stage.get_state()
+                for i, stage in enumerate(self.stages)
+                if hasattr(stage, "get_state")
+            },
+        }
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        self.stats = Counter(state.get("stats", {}))
+        self.stage_time = defaultdict(float, state.get("stage_time", {}))
+        self.stage_drops = Counter(state.get("stage_drops", {}))
+        self.stage_latency = defaultdict(LatencyHistogram)
+        for name, hist_state in state.get("stage_latency", {}).items():
+            self.stage_latency[name].set_state(hist_state)
+        for index, stage_state in state.get("stages", {}).items():
+            stage = self.stages[int(index)]
+            if hasattr(stage, "set_state"):
+                stage.set_state(stage_state)
+
     @abstractmethod
     def process(self, data: Any) -> Union[str, Any]:
         ...
 
 
+_MISSING = object()
+
+
+def _detach(value: Any) -> Any:
+    # Stages mutate records in place, so cached records are never shared.
+    # Parsed JSON only needs its containers copied; deepcopy's memo made a
+    # cache hit slower than parsing again.
+    kind = type(value)
+    if kind is dict:
+        return {k: _detach(v) for k, v in value.items()}
+    if kind is list:
+        return [_detach(v) for v in value]
+    if isinstance(value, (str, bytes, int, float, type(None))):
+        return value
+    return copy.deepcopy(value)
+
+
 class JSONAdapter(ProcessingPipeline):
+    def __init__(
+        self,
+        pipeline_id: str,
+        cache_size: int = 0,
+        cache_exclude: Iterable[str] = (),
+        timing_sample: int = 1,
+    ) -> None:
+        super().__init__(pipeline_id, timing_sample)
+        if cache_size < 0:
+            raise ValueError("cache_size must be >= 0")
+        self.cache_size = cache_size
+        # Stage class names whose output must be fresh on every record.
+        # Stages with a restamp() method (TransformStage, which stamps the
+        # current time) stay cached and only get their clock fields redone
+        # on a hit; any other excluded stage ends the cached prefix.
+        self.cache_exclude = frozenset(cache_exclude)
+        self._cache: OrderedDict[bytes, Any] = OrderedDict()
+        self._cache_stages: Tuple[ProcessingStage, ...] = ()
+        self._cache_split: Optional[int] = None
+        self._cache_restamp: List[Any] = []
+
+    def _prepare(self, data: Any) -> Any:
+        if isinstance(data, (str, bytes, bytearray)):
+            parsed = json.loads(data)
+        elif isinstance(data, dict):
+            parsed = data
+        else:
+            raise TypeError("JSONAdapter expects str, bytes or dict")
+
+        parsed["final"] = True
+        parsed.setdefault("meta", {})
+        parsed["meta"]["safe_mode"] = self.pipeline_id.endswith("_BACKUP")
+        return parsed
+
     def process(self, data: Any) -> Union[str, Any]:
         try:
-            if isinstance(data, str):
-                parsed = json.loads(data)
-            elif isinstance(data, dict):
-                parsed = data
+            if self.cache_size and isinstance(data, (str, bytes, bytearray)):
+                out = self._run_cached(data)
             else:
-                raise TypeError("JSONAdapter expects str or dict")
-
-            parsed["final"] = True
-            parsed.setdefault("meta", {})
-            parsed["meta"]["safe_mode"] = self.pipeline_id.endswith("_BACKUP")
-
-            out = self._run_stages(parsed)
+                out = self._run_stages(self._prepare(data))
             self.stats["processed"] += 1
             return out
         except Exception as exc:
             self.stats["errors"] += 1
             raise RuntimeError(f"JSONAdapter failed: {exc}") from exc
 
+    def _cache_plan(self) -> Optional[int]:
+        # Recomputed only when the stage list changes (add_stage, optimize).
+        stages = tuple(self.stages)
+        if stages != self._cache_stages:
+            split = len(stages)
+            restamp: List[Any] = []
+            for i, stage in enumerate(stages):
+                if _stage_name(stage) not in self.cache_exclude:
+                    continue
+                if callable(getattr(stage, "restamp", None)):
+                    restamp.append(stage)
+                    continue
+                split = i
+                break
+            # A prefix of bare InputStages is not worth caching: copying a
+            # hit costs more than parsing again.
+            cheap = all(type(stage) is InputStage for stage in stages[:split])
+            self._cache_stages = stages
+            self._cache_split = None if cheap else split
+            self._cache_restamp = restamp
+        return self._cache_split
+
+    def _run_cached(self, raw: Union[str, bytes, bytearray]) -> Any:
+        split = self._cache_plan()
+        if split is None:
+            self.stats["cache_bypassed"] += 1
+            return self._run_stages(self._prepare(raw))
+        prefix, suffix = self.stages[:split], self.stages[split:]
+
+        payload = raw.encode("utf-8") if isinstance(raw, str) else raw
+        key = hashlib.blake2b(payload, digest_size=16).digest()
+        cached = self._cache.get(key, _MISSING)
+        if cached is not _MISSING:
+            self._cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            current = _detach(cached)
+            for stage in self._cache_restamp:
+                current = stage.restamp(current)
+        else:
+            self.stats["cache_misses"] += 1
+            current = self._run_stages(self._prepare(raw), prefix)
+            self._cache[key] = _detach(current)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+                self.stats["cache_evictions"] += 1
+
+        return self._run_stages(current, suffix) if suffix else current
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+    def get_stats(self, reset_latency: bool = False) -> Dict[str, Any]:
+        stats = super().get_stats(reset_latency)
+        if self.cache_size:
+            stats["cache"] = {
+                "hits": int(self.stats.get("cache_hits", 0)),
+                "misses": int(self.stats.get("cache_misses", 0)),
+                "evictions": int(self.stats.get("cache_evictions", 0)),
+                "bypassed": int(self.stats.get("cache_bypassed", 0)),
+                "size": len(self._cache),
+                "capacity": self.cache_size,
+            }
+        return stats
+
+    def iter_file(
+        self,
+        path: Union[str, os.PathLike[str]],
+        batch_size: int = 512,
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> Iterator[Any]:
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+
+        source = os.path.abspath(path)
+        offset = 0
+        if checkpoint is not None:
+            saved = checkpoint.load()
+            if saved is not None and saved.get("source") == source:
+                offset = int(saved["offset"])
+                self.load_state(saved["pipeline"])
+
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size <= offset:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                mm.seek(offset)
+                # Lines stay raw bytes until their batch is decoded.
+                batch: List[bytes] = []
+                pending = 0
+                for line in iter(mm.readline, b""):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    batch.append(line)
+                    if len(batch) >= batch_size:
+                        yield from self.process_batch(batch)
+                        pending += len(batch)
+                        batch = []
+                        if checkpoint and pending >= checkpoint.every:
+                            self._save_offset(checkpoint, source, mm.tell())
+                            pending = 0
+                if batch:
+                    yield from self.process_batch(batch)
+                if checkpoint is not None:
+                    self._save_offset(checkpoint, source, mm.tell())
+
+    def _save_offset(
+        self,
+        checkpoint: Checkpoint,
+        source: str,
+        offset: int,
+    ) -> None:
+        # Saved only after the batch was consumed: at-least-once replay.
+        checkpoint.save(
+            {"source": source, "offset": offset, "pipeline": self.state_dict()}
+        )
+
+    def process_file(
+        self,
+        path: Union[str, os.PathLike[str]],
+        batch_size: int = 512,
+        sink: Optional[Callable[[Any], None]] = None,
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> Dict[str, Union[int, float]]:
+        records = 0
+        errors = 0
+        t0 = time.perf_counter()
+        for out in self.iter_file(path, batch_size, checkpoint):
+            records += 1
+            if isinstance(out, Exception):
+                errors += 1
+            if sink is not None:
+                sink(out)
+        elapsed = time.perf_counter() - t0
+        return {
+            "records": records,
+            "processed": records - errors,
+            "errors": errors,
+            "elapsed_s": elapsed,
+            "records_per_s": (records / elapsed) if elapsed > 0 else 0.0,
+        }
+
+
+_CSVSource = Union[str, "os.PathLike[str]", Iterable[str]]
+
+
+@contextmanager
+def _csv_lines(source: _CSVSource) -> Iterator[Iterable[str]]:
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, newline="", encoding="utf-8") as f:
+            yield f
+    else:
+        yield source
+
+
+# Plain decimal notation only. int()/float() also take "007", "+5",
+# "1_000", " 5" and "nan", whose text a number cannot give back.
+_CSV_FLOAT = re.compile(
+    r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?"
+)
+
+
+def _csv_cell(kind: str, cell: str) -> Union[int, float, str]:
+    if kind == "int":
+        value = int(cell)
+        if str(value) != cell:
+            raise ValueError(f"not a plain integer: {cell!r}")
+        return value
+    if kind == "float":
+        if cell == "":
+            return math.nan
+        if not _CSV_FLOAT.fullmatch(cell):
+            raise ValueError(f"not a plain number: {cell!r}")
+        return float(cell)
+    return cell
+
+
+def _csv_text(value: Union[int, float, str]) -> str:
+    # Inverse of _csv_cell for cells that round-trip exactly.
+    if isinstance(value, float):
+        if value != value:
+            return ""
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+    return str(value)
+
+
+def infer_csv_schema(
+    fieldnames: Sequence[str],
+    rows: Iterable[Sequence[str]],
+) -> Dict[str, str]:
+    widths = {"int": 0, "float": 1, "str": 2}
+    kinds: List[Optional[str]] = [None] * len(fieldnames)
+    blanks = [False] * len(fieldnames)
+    for row in rows:
+        for i in range(len(fieldnames)):
+            cell = row[i] if i < len(row) else ""
+            if cell == "":
+                blanks[i] = True
+                continue
+            current = kinds[i]
+            if current == "str":
+                continue
+            for kind in ("int", "float", "str"):
+                if current is not None and widths[kind] < widths[current]:
+                    continue
+                try:
+                    _csv_cell(kind, cell)
+                except ValueError:
+                    continue
+                kinds[i] = kind
+                break
+
+    schema: Dict[str, str] = {}
+    for name, inferred, blank in zip(fieldnames, kinds, blanks):
+        kind = inferred or "str"
+        if kind == "int" and blank:
+            # Missing ints become NaN, which only a float column can hold.
+            kind = "float"
+        schema[name] = kind
+    return schema
+
+
+class CSVColumns:
+    # Typed column store: ints in array("q"), floats in array("d"),
+    # anything else as a list of str. A cell that does not fit widens
+    # its column (int -> float -> str) instead of failing the load; cells
+    # whose text a number would not reproduce ("007", "1.50") are kept
+    # aside so a widening to str restores the original text.
+    def __init__(
+        self,
+        fieldnames: Sequence[str],
+        schema: Dict[str, str],
+    ) -> None:
+        self.fieldnames = list(fieldnames)
+        self.schema = {name: schema.get(name, "str") for name in fieldnames}
+        self.columns: Dict[str, Any] = {
+            name: self._empty(self.schema[name]) for name in self.fieldnames
+        }
+        self._length = 0
+        self._raw: Dict[str, Dict[int, str]] = defaultdict(dict)
+        self._ints: Dict[str, Any] = {}
+
+    @staticmethod
+    def _empty(kind: str) -> Any:
+        if kind == "int":
+            return array("q")
+        if kind == "float":
+            return array("d")
+        return []
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> Tuple[Any, ...]:
+        return tuple(self.columns[name][index] for name in self.fieldnames)
+
+    def __iter__(self) -> Iterator[Tuple[Any, ...]]:
+        return zip(*(self.columns[name] for name in self.fieldnames))
+
+    def append(self, row: Sequence[str]) -> None:
+        for i, name in enumerate(self.fieldnames):
+            cell = row[i] if i < len(row) else ""
+            kind = self.schema[name]
+            try:
+                value = _csv_cell(kind, cell)
+                self.columns[name].append(value)
+            except (ValueError, OverflowError):
+                self._widen(name, cell)
+                continue
+            if kind != "str" and _csv_text(value) != cell:
+                self._raw[name][self._length] = cell
+        self._length += 1
+
+    def _widen(self, name: str, cell: str) -> None:
+        column = self.columns[name]
+        if self.schema[name] == "int":
+            # The ints are kept: their float copies print as "1.0".
+            self._ints[name] = column
+            self.schema[name] = "float"
+            column = self.columns[name] = array("d", column)
+            try:
+                value = _csv_cell("float", cell)
+            except ValueError:
+                pass
+            else:
+                column.append(value)
+                if _csv_text(value) != cell:
+                    self._raw[name][self._length] = cell
+                return
+
+        ints = self._ints.pop(name, ())
+        raw = self._raw.pop(name, {})
+        text: List[str] = []
+        for i, value in enumerate(column):
+            if i in raw:
+                text.append(raw[i])
+            elif i < len(ints):
+                text.append(str(ints[i]))
+            else:
+                text.append(_csv_text(value))
+        text.append(cell)
+        self.schema[name] = "str"
+        self.columns[name] = text
+
 
 class CSVAdapter(ProcessingPipeline):
+    def _prepare(self, data: Any) -> Any:
+        if not isinstance(data, str):
+            raise TypeError("CSVAdapter expects str")
+
+        f = io.StringIO(data.strip())
+        reader = csv.DictReader(f)
+        rows = list(reader)
+
+        actions = len(rows) if rows else (1 if reader.fieldnames else 0)
+        return self._payload(rows, actions)
+
+    def _payload(
+        self,
+        rows: List[Dict[str, str]],
+        actions: int,
+    ) -> Dict[str, Any]:
+        return {
+            "type": "csv",
+            "rows": rows,
+            "analysis": {"actions": actions},
+            "final": True,
+            "meta": {},
+        }
+
     def process(self, data: Any) -> Any:
         try:
-            if not isinstance(data, str):
-                raise TypeError("CSVAdapter expects str")
-
-            f = io.StringIO(data.strip())
-            reader = csv.DictReader(f)
-            rows = list(reader)
-
-            actions = len(rows) if rows else (1 if reader.fieldnames else 0)
+            out = self._run_stages(self._prepare(data))
+            self.stats["processed"] += 1
+            return out
 
-            payload: Dict[str, Any] = {
-                "type": "csv",
-                "rows": rows,
-                "analysis": {"actions": actions},
-                "final": True,
-                "meta": {},
-            }
+        except Exception as exc:
+            self.stats["errors"] += 1
+            raise RuntimeError(f"CSVAdapter failed: {exc}") from exc
 
+    def iter_stream(
+        self,
+        source: _CSVSource,
+        chunk_size: int = 1000,
+    ) -> Iterator[Any]:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+
+        with _csv_lines(source) as lines:
+            reader = csv.DictReader(lines)
+            actions = 0
+            while True:
+                try:
+                    rows = list(islice(reader, chunk_size))
+                except Exception as exc:
+                    self.stats["errors"] += 1
+                    raise RuntimeError(f"CSVAdapter failed: {exc}") from exc
+                if not rows:
+                    break
+                actions += len(rows)
+                yield self._run_chunk(rows, actions)
+
+            if actions == 0:
+                yield self._run_chunk([], 1 if reader.fieldnames else 0)
+
+    def process_stream(
+        self,
+        source: _CSVSource,
+        chunk_size: int = 1000,
+    ) -> Any:
+        out: Any = None
+        for out in self.iter_stream(source, chunk_size):
+            pass
+        return out
+
+    def iter_tuples(
+        self,
+        source: _CSVSource,
+        sample_rows: int = 100,
+    ) -> Iterator[Tuple[Any, ...]]:
+        with _csv_lines(source) as lines:
+            reader = csv.reader(lines)
+            fieldnames = next(reader, None)
+            if fieldnames is None:
+                return
+            sample = list(islice(reader, sample_rows))
+            schema = infer_csv_schema(fieldnames, sample)
+            kinds = [schema[name] for name in fieldnames]
+
+            def convert(row: List[str]) -> Tuple[Any, ...]:
+                out: List[Any] = []
+                for i, kind in enumerate(kinds):
+                    cell = row[i] if i < len(row) else ""
+                    try:
+                        out.append(_csv_cell(kind, cell))
+                    except ValueError:
+                        out.append(cell)
+                return tuple(out)
+
+            for row in sample:
+                yield convert(row)
+            for row in reader:
+                yield convert(row)
+
+    def read_columns(
+        self,
+        source: _CSVSource,
+        sample_rows: int = 100,
+    ) -> CSVColumns:
+        with _csv_lines(source) as lines:
+            reader = csv.reader(lines)
+            fieldnames = next(reader, None) or []
+            sample = list(islice(reader, sample_rows))
+            columns = CSVColumns(
+                fieldnames, infer_csv_schema(fieldnames, sample)
+            )
+            for row in sample:
+                columns.append(row)
+            for row in reader:
+                columns.append(row)
+        return columns
+
+    def process_typed(
+        self,
+        source: _CSVSource,
+        sample_rows: int = 100,
+    ) -> Any:
+        try:
+            columns = self.read_columns(source, sample_rows)
+            actions = len(columns) or (1 if columns.fieldnames else 0)
+            payload = self._payload([], actions)
+            payload["rows"] = columns
             out = self._run_stages(payload)
             self.stats["processed"] += 1
             return out
+        except Exception as exc:
+            self.stats["errors"] += 1
+            raise RuntimeError(f"CSVAdapter failed: {exc}") from exc
 
+    def _run_chunk(self, rows: List[Dict[str, str]], actions: int) -> Any:
+        try:
+            out = self._run_stages(self._payload(rows, actions))
+            self.stats["processed"] += 1
+            return out
         except Exception as exc:
             self.stats["errors"] += 1
             raise RuntimeError(f"CSVAdapter failed: {exc}") from exc
 
 
+class SlidingWindow:
+    # Windows cover [end - size, end) and close every `step` (events or
+    # seconds); step == size gives tumbling windows. Min/max come from
+    # monotonic deques and the mean from a running sum, so each event
+    # costs O(1) amortised.
+    def __init__(
+        self,
+        size: float,
+        step: Optional[float] = None,
+        by: str = "count",
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if by not in ("count", "time"):
+            raise ValueError("by must be 'count' or 'time'")
+        step = size if step is None else step
+        if by == "count" and not all(
+            isinstance(n, int) and not isinstance(n, bool)
+            for n in (size, step)
+        ):
+            # A fractional end is never hit by the integer event count.
+            raise TypeError("count windows need integer size and step")
+        if size <= 0 or not 0 < step <= size:
+            raise ValueError("window needs size > 0 and 0 < step <= size")
+        self.size = size
+        self.step = step
+        self.by = by
+        self.clock = clock
+        self._events: Deque[Tuple[float, float]] = deque()
+        self._min: Deque[Tuple[float, float]] = deque()
+        self._max: Deque[Tuple[float, float]] = deque()
+        self._sum = 0.0
+        self._seen = 0
+        self._next_end: Optional[float] = size if by == "count" else None
+        self._dirty = False
+
+    def _evict(self, start: float) -> None:
+        events = self._events
+        while events and events[0][0] < start:
+            self._sum -= events.popleft()[1]
+        while self._min and self._min[0][0] < start:
+            self._min.popleft()
+        while self._max and self._max[0][0] < start:
+            self._max.popleft()
+
+    def _push(self, pos: float, value: float) -> None:
+        self._events.append((pos, value))
+        self._sum += value
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((pos, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((pos, value))
+        self._dirty = True
+
+    def _emit(
+        self,
+        end: float,
+        start: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        if start is None:
+            start = end - self.size
+        count = len(self._events)
+        self._dirty = False
+        return {
+            "analysis": {
+                "count": count,
+                "avg": self._sum / count,
+                "sum": self._sum,
+                "min": self._min[0][1],
+                "max": self._max[0][1],
+            },
+            "window": {"by": self.by, "start": start, "end": end},
+            "final": True,
+        }
+
+    def add(
+        self,
+        value: float,
+        ts: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        closed: List[Dict[str, Any]] = []
+        if self.by == "count":
+            self._push(self._seen, value)
+            self._seen += 1
+            if self._seen == self._next_end:
+                self._evict(self._seen - self.size)
+                closed.append(self._emit(self._seen))
+                self._next_end += self.step
+                self._evict(self._next_end - self.size)
+            return closed
+
+        now = self.clock() if ts is None else ts
+        if self._next_end is None:
+            self._next_end = (now // self.step + 1) * self.step
+        while now >= self._next_end:
+            self._evict(self._next_end - self.size)
+            if self._events:
+                closed.append(self._emit(self._next_end))
+                self._next_end += self.step
+            else:
+                # Nothing buffered: jump straight to the window holding now.
+                self._next_end = (now // self.step + 1) * self.step
+        self._push(now, value)
+        return closed
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "events": list(self._events),
+            "min": list(self._min),
+            "max": list(self._max),
+            "sum": self._sum,
+            "seen": self._seen,
+            "next_end": self._next_end,
+            "dirty": self._dirty,
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self._events = deque(tuple(e) for e in state["events"])
+        self._min = deque(tuple(e) for e in state["min"])
+        self._max = deque(tuple(e) for e in state["max"])
+        self._sum = float(state["sum"])
+        self._seen = int(state["seen"])
+        self._next_end = state["next_end"]
+        self._dirty = bool(state["dirty"])
+
+    def flush(self) -> List[Dict[str, Any]]:
+        if not self._dirty:
+            return []
+        if self.by == "count":
+            # Events before the pending window's start were evicted when
+            # the previous window closed.
+            end = float(self._seen)
+            start = max(end, float(self._next_end or 0.0)) - self.size
+        else:
+            end = self._next_end if self._next_end is not None else 0.0
+            start = end - self.size
+        self._evict(start)
+        return [self._emit(end, start)] if self._events else []
+
+
 class StreamAdapter(ProcessingPipeline):
+    def _prepare(self, data: Any) -> Any:
+        if isinstance(data, str):
+            return [{"value": 22.0}, {"value": 22.3}, {"value": 22.1}]
+        if isinstance(data, (list, Iterator)):
+            return data
+        raise TypeError("StreamAdapter expects str, list or iterator")
+
     def process(self, data: Any) -> Union[str, Any]:
         try:
-            if isinstance(data, str):
-                stream_data = [{"value": 22.0}, {"value": 22.3}, {"value": 22.1}] # noqa
-            elif isinstance(data, list):
-                stream_data = data
-            else:
-                raise TypeError("StreamAdapter expects str or list")
+            out = self._run_stages(self._prepare(data))
+            self.stats["processed"] += 1
+            return out
+        except Exception as exc:
+            self.stats["errors"] += 1
+            raise RuntimeError(f"StreamAdapter failed: {exc}") from exc
 
-            out = self._run_stages(stream_data)
+    def summarize(self, readings: Iterable[Any]) -> Union[str, Any]:
+        # Readings are consumed lazily, so unbounded sources are fine.
+        return self.process(iter(readings))
+
+    def process_windowed(
+        self,
+        events: Iterable[Any],
+        window: SlidingWindow,
+        checkpoint: Optional[Checkpoint] = None,
+        source: Optional[str] = None,
+    ) -> Iterator[Any]:
+        # An iterable has no name of its own, so the caller supplies one;
+        # the window shape is part of the identity too.
+        identity = [source, window.by, window.size, window.step]
+        if checkpoint is not None and source is None:
+            raise ValueError("process_windowed needs a source to checkpoint")
+        offset = 0
+        if checkpoint is not None:
+            saved = checkpoint.load()
+            if saved is not None and saved.get("source") == identity:
+                offset = int(saved["offset"])
+                window.set_state(saved["window"])
+                self.load_state(saved["pipeline"])
+        position = offset
+        since_save = 0
+
+        for event in islice(events, offset, None):
+            position += 1
+            since_save += 1
+            if checkpoint is not None and since_save >= checkpoint.every:
+                # Taken before this event is applied, so it is replayed.
+                self._save_window(checkpoint, identity, window, position - 1)
+                since_save = 0
+            ts = None
+            if isinstance(event, dict):
+                ts = event.get("ts")
+                event = event.get("value")
+            try:
+                value = float(event)
+            except (TypeError, ValueError):
+                # ignora item inválido na agregação
+                continue
+            for record in window.add(value, ts):
+                yield self._run_window(record)
+
+        for record in window.flush():
+            yield self._run_window(record)
+        if checkpoint is not None:
+            self._save_window(checkpoint, identity, window, position)
+
+    def _save_window(
+        self,
+        checkpoint: Checkpoint,
+        identity: List[Any],
+        window: SlidingWindow,
+        offset: int,
+    ) -> None:
+        checkpoint.save(
+            {
+                "source": identity,
+                "offset": offset,
+                "window": window.get_state(),
+                "pipeline": self.state_dict(),
+            }
+        )
+
+    def _run_window(self, record: Dict[str, Any]) -> Any:
+        try:
+            out = self._run_stages(record)
             self.stats["processed"] += 1
             return out
         except Exception as exc:
@@ -257,41 +1854,1208 @@ class StreamAdapter(ProcessingPipeline):
             raise RuntimeError(f"StreamAdapter failed: {exc}") from exc
 
 
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw_default(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return dict(value)
+    name = type(value).__name__
+    raise TypeError(f"Object of type {name} is not JSON serializable")
+
+
+class ThresholdAlertStage:
+    def __init__(self, low: float = 0.0, high: float = 35.0) -> None:
+        self.low = low
+        self.high = high
+
+    def process(self, data: Any) -> Any:
+        value = float(data["value"])
+        return {
+            "sensor": data.get("sensor"),
+            "value": value,
+            "alert": value < self.low or value > self.high,
+        }
+
+
+class RunningStatsStage:
+    def __init__(self) -> None:
+        self.aggregator = OnlineAggregator()
+
+    def process(self, data: Any) -> Any:
+        self.aggregator.add(float(data["value"]))
+        return self.aggregator.summary()
+
+    def get_state(self) -> Dict[str, float]:
+        return self.aggregator.get_state()
+
+    def set_state(self, state: Dict[str, float]) -> None:
+        self.aggregator.set_state(state)
+
+
+class ArchiveStage:
+    # One append handle for the stage's lifetime, flushed per record.
+    def __init__(self, path: Union[str, os.PathLike[str]]) -> None:
+        self.path = path
+        self._file: Optional[TextIO] = None
+
+    def process(self, data: Any) -> Any:
+        line = json.dumps(data, default=_thaw_default)
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(line + "\n")
+        self._file.flush()
+        return len(line)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Copies (e.g. in worker processes) reopen the file themselves.
+        return {"path": self.path, "_file": None}
+
+
+class EnrichmentStage:
+    # Joins records against a prebuilt key -> row index. A daemon thread
+    # rebuilds it when the source file changes and swaps it in whole, so
+    # readers never see a half-loaded table.
+    stage_name = "EnrichmentStage"
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike[str]],
+        key: str = "device",
+        fields: Optional[Sequence[str]] = None,
+        table: Optional[str] = None,
+        target: str = "device_info",
+        reload_interval_s: float = 5.0,
+    ) -> None:
+        self.path = path
+        self.key = key
+        self.fields = tuple(fields) if fields else None
+        self.table = table
+        self.target = target
+        self.stats: Counter[str] = Counter()
+        self._mtime = os.stat(path).st_mtime_ns
+        self.index: Dict[str, Dict[str, Any]] = self._load()
+        self.reload_interval_s = reload_interval_s
+        self._closed = False
+        self._start_watcher()
+        _ENRICHMENT_STAGES.add(self)
+
+    def _start_watcher(self) -> None:
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if self.reload_interval_s > 0 and not self._closed:
+            self._thread = threading.Thread(
+                target=self._watch, args=(self.reload_interval_s,), daemon=True
+            )
+            self._thread.start()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The index travels with the copy; the watcher is per process.
+        state = dict(self.__dict__)
+        del state["_stop"], state["_thread"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._start_watcher()
+        _ENRICHMENT_STAGES.add(self)
+
+    def _rows(self) -> Tuple[List[str], List[Sequence[Any]]]:
+        if self.table is not None:
+            quoted = '"' + self.table.replace('"', '""') + '"'
+            uri = f"file:{os.fspath(self.path)}?mode=ro"
+            with closing(sqlite3.connect(uri, uri=True)) as conn:
+                cur = conn.execute(f"SELECT * FROM {quoted}")
+                names = [col[0] for col in cur.description]
+                return names, cur.fetchall()
+
+        with open(self.path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            names = next(reader, [])
+            rows = list(reader)
+        schema = infer_csv_schema(names, rows)
+        kinds = [schema[name] for name in names]
+        typed: List[Sequence[Any]] = [
+            [
+                _csv_cell(kind, row[i] if i < len(row) else "")
+                for i, kind in enumerate(kinds)
+            ]
+            for row in rows
+        ]
+        return names, typed
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        names, rows = self._rows()
+        if not names:
+            return {}
+        if self.key not in names:
+            raise ValueError(f"EnrichmentStage: no '{self.key}' column")
+        key_col = names.index(self.key)
+        wanted = self.fields or [n for n in names if n != self.key]
+        cols = [(name, names.index(name)) for name in wanted]
+        return {
+            str(row[key_col]): {name: row[i] for name, i in cols}
+            for row in rows
+        }
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                if mtime == self._mtime:
+                    continue
+                index = self._load()
+            except (OSError, ValueError, sqlite3.Error):
+                # Keep serving the old index until the file reads cleanly.
+                self.stats["reload_errors"] += 1
+                continue
+            self.index = index
+            self._mtime = mtime
+            self.stats["reloads"] += 1
+
+    def _join(self, index: Dict[str, Dict[str, Any]], data: Any) -> bool:
+        if not isinstance(data, dict):
+            return False
+        meta = data.setdefault("meta", {})
+        key = data.get(self.key, meta.get(self.key))
+        entry = index.get(str(key)) if key is not None else None
+        if entry is None:
+            return False
+        meta.setdefault(self.target, {}).update(entry)
+        return True
+
+    def process(self, data: Any) -> Any:
+        hit = self._join(self.index, data)
+        self.stats["hits" if hit else "misses"] += 1
+        return data
+
+    def process_batch(self, batch: List[Any]) -> List[Any]:
+        # One index snapshot per batch, even if a reload lands midway.
+        index = self.index
+        join = self._join
+        hits = 0
+        for data in batch:
+            hits += join(index, data)
+        self.stats["hits"] += hits
+        self.stats["misses"] += len(batch) - hits
+        return batch
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"rows": len(self.index), **self.stats}
+
+    def close(self) -> None:
+        self._closed = True
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+# Forked children inherit the stages but not their watcher threads.
+_ENRICHMENT_STAGES: weakref.WeakSet[EnrichmentStage] = weakref.WeakSet()
+
+
+def _restart_enrichment_watchers() -> None:
+    for stage in list(_ENRICHMENT_STAGES):
+        stage._start_watcher()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_enrichment_watchers)
+
+
+class DAGPipeline(ProcessingPipeline):
+    # Trunk stages (add_stage) parse once; the result is frozen and
+    # shared read-only by every branch, then the join merges outputs.
+    def __init__(
+        self,
+        pipeline_id: str,
+        join: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        timing_sample: int = 1,
+    ) -> None:
+        super().__init__(pipeline_id, timing_sample)
+        self.branches: Dict[str, List[ProcessingStage]] = {}
+        self.join = join
+
+    def add_branch(
+        self,
+        name: str,
+        stages: Iterable[ProcessingStage],
+    ) -> None:
+        if name in self.branches:
+            raise ValueError(f"Branch already exists: {name}")
+        branch = list(stages)
+        for stage in branch:
+            if not isinstance(stage, ProcessingStage):
+                raise TypeError("Stage must implement process(self, data)")
+        self.branches[name] = branch
+
+    def _prepare(self, data: Any) -> Any:
+        if isinstance(data, (str, bytes, bytearray)):
+            return json.loads(data)
+        if isinstance(data, dict):
+            return data
+        raise TypeError("DAGPipeline expects str, bytes or dict")
+
+    def _run_branch(
+        self,
+        name: str,
+        stages: List[ProcessingStage],
+        record: Any,
+    ) -> Any:
+        # Sampled in step with the trunk run for the same record.
+        current = record
+        sample = self.timing_sample
+        timed = sample == 1 or self._runs % sample == 0
+        for stage in stages:
+            stage_name = f"{name}.{_stage_name(stage)}"
+            t0 = time.perf_counter() if timed else 0.0
+            try:
+                current = stage.process(current)
+            except Exception as exc:
+                _tag_stage(exc, stage_name)
+                raise
+            if timed:
+                elapsed = time.perf_counter() - t0
+                self.stage_time[stage_name] += elapsed * sample
+                self.stage_latency[stage_name].record(elapsed, sample)
+            if current is DROPPED:
+                self.stage_drops[stage_name] += 1
+                break
+        return current
+
+    def _fan_out(self, current: Any) -> Any:
+        if current is DROPPED:
+            return DROPPED
+        record = _freeze(current)
+        outputs = {}
+        for name, stages in self.branches.items():
+            out = self._run_branch(name, stages, record)
+            # A branch that filtered the record out contributes nothing.
+            if out is not DROPPED:
+                outputs[name] = out
+        return self.join(outputs) if self.join is not None else outputs
+
+    def process(self, data: Any) -> Any:
+        try:
+            out = self._fan_out(self._run_stages(self._prepare(data)))
+            self.stats["processed"] += 1
+            return out
+        except Exception as exc:
+            self.stats["errors"] += 1
+            raise RuntimeError(f"DAGPipeline failed: {exc}") from exc
+
+    def process_batch(self, records: Iterable[Any]) -> List[Any]:
+        # The trunk runs batched; branches and the join then run per slot,
+        # with failures kept in their slot as in ProcessingPipeline.
+        prepared: List[Any] = []
+        for record in records:
+            try:
+                prepared.append(self._prepare(record))
+            except Exception as exc:
+                prepared.append(exc)
+
+        out: List[Any] = []
+        for value in self._run_stages_batch(prepared):
+            if not isinstance(value, Exception):
+                # Keeps branch timing sampled per record, as in process().
+                self._runs += 1
+                try:
+                    value = self._fan_out(value)
+                except Exception as exc:
+                    value = exc
+            if isinstance(value, Exception):
+                self.stats["errors"] += 1
+                err = RuntimeError(f"DAGPipeline failed: {value}")
+                err.__cause__ = value
+                out.append(err)
+            else:
+                self.stats["processed"] += 1
+                out.append(value)
+        return out
+
+
+_RING_HEADER = struct.Struct("<QQ")
+_RING_RECORD = struct.Struct("<Id4sd")
+_RingRecord = Tuple[int, float, bytes, float]
+
+
+class SensorRing:
+    # Layout: [head u64][tail u64] followed by `capacity` packed records
+    # (sensor id u32, value f64, unit 4s, timestamp f64). head and tail
+    # only grow; the producer publishes head after writing the slot.
+    # One consumer; several producers must share a multiprocessing.Lock.
+    def __init__(
+        self,
+        shm: shared_memory.SharedMemory,
+        capacity: int,
+        owner: bool = False,
+        lock: Optional[Any] = None,
+    ) -> None:
+        self.shm = shm
+        self.capacity = capacity
+        self.owner = owner
+        self.lock = lock
+        buf = shm.buf
+        if buf is None:
+            raise ValueError("SensorRing: shared memory is closed")
+        self._buf: memoryview = buf
+        self._readers: weakref.WeakSet[
+            Generator[_RingRecord, None, None]
+        ] = weakref.WeakSet()
+
+    @classmethod
+    def create(
+        cls,
+        capacity: int,
+        name: Optional[str] = None,
+        lock: Optional[Any] = None,
+    ) -> SensorRing:
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        size = _RING_HEADER.size + capacity * _RING_RECORD.size
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        ring = cls(shm, capacity, owner=True, lock=lock)
+        _RING_HEADER.pack_into(ring._buf, 0, 0, 0)
+        return ring
+
+    @classmethod
+    def attach(
+        cls,
+        name: str,
+        capacity: int,
+        lock: Optional[Any] = None,
+    ) -> SensorRing:
+        return cls(shared_memory.SharedMemory(name=name), capacity, lock=lock)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def __len__(self) -> int:
+        head, tail = _RING_HEADER.unpack_from(self._buf, 0)
+        return head - tail
+
+    def push(
+        self,
+        sensor_id: int,
+        value: float,
+        unit: str = "C",
+        timestamp: Optional[float] = None,
+    ) -> bool:
+        if self.lock is None:
+            return self._push(sensor_id, value, unit, timestamp)
+        with self.lock:
+            return self._push(sensor_id, value, unit, timestamp)
+
+    def _push(
+        self,
+        sensor_id: int,
+        value: float,
+        unit: str,
+        timestamp: Optional[float],
+    ) -> bool:
+        head, tail = _RING_HEADER.unpack_from(self._buf, 0)
+        if head - tail >= self.capacity:
+            return False
+        offset = (
+            _RING_HEADER.size + (head % self.capacity) * _RING_RECORD.size
+        )
+        _RING_RECORD.pack_into(
+            self._buf,
+            offset,
+            sensor_id,
+            value,
+            unit.encode("utf-8")[:4],
+            time.time() if timestamp is None else timestamp,
+        )
+        struct.pack_into("<Q", self._buf, 0, head + 1)
+        return True
+
+    def read(
+        self,
+        max_records: Optional[int] = None,
+    ) -> Iterator[_RingRecord]:
+        reader = self._read(max_records)
+        self._readers.add(reader)
+        return reader
+
+    def _read(
+        self,
+        max_records: Optional[int] = None,
+    ) -> Generator[_RingRecord, None, None]:
+        head, tail = _RING_HEADER.unpack_from(self._buf, 0)
+        available = head - tail
+        if max_records is not None:
+            available = min(available, max_records)
+        if available <= 0:
+            return
+
+        start = tail % self.capacity
+        first = min(available, self.capacity - start)
+        consumed = 0
+        try:
+            for begin, count in ((start, first), (0, available - first)):
+                if not count:
+                    continue
+                lo = _RING_HEADER.size + begin * _RING_RECORD.size
+                view = self._buf[lo:lo + count * _RING_RECORD.size]
+                for record in _RING_RECORD.iter_unpack(view):
+                    consumed += 1
+                    yield record
+        finally:
+            # Slots are released only once the consumer has seen them.
+            struct.pack_into("<Q", self._buf, 8, tail + consumed)
+
+    def close(self) -> None:
+        # Open readers hold views into the segment and still owe a tail
+        # update; finish them before the mapping goes away.
+        for reader in list(self._readers):
+            reader.close()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class RingConsumer:
+    def __init__(
+        self,
+        ring: SensorRing,
+        sensor_names: Sequence[str] = ("temp",),
+    ) -> None:
+        self.ring = ring
+        self.sensor_names = list(sensor_names)
+
+    def values(self, max_records: Optional[int] = None) -> Iterator[float]:
+        for _, value, _, _ in self.ring.read(max_records):
+            yield value
+
+    def summarize(
+        self,
+        stream: StreamAdapter,
+        max_records: Optional[int] = None,
+    ) -> Any:
+        return stream.summarize(self.values(max_records))
+
+    def to_columnar(
+        self,
+        max_records: Optional[int] = None,
+    ) -> ColumnarBatch:
+        batch = ColumnarBatch()
+        names = self.sensor_names
+        sensor_codes: Dict[int, int] = {}
+        unit_codes: Dict[bytes, int] = {}
+        for sensor_id, value, unit, _ in self.ring.read(max_records):
+            code = sensor_codes.get(sensor_id)
+            if code is None:
+                name = (
+                    names[sensor_id] if sensor_id < len(names)
+                    else str(sensor_id)
+                )
+                code = sensor_codes[sensor_id] = batch.sensor_code(name)
+            unit_code = unit_codes.get(unit)
+            if unit_code is None:
+                unit_code = unit_codes[unit] = batch.unit_code(
+                    unit.rstrip(b"\0").decode("utf-8")
+                )
+            batch.sensor.append(code)
+            batch.value.append(value)
+            batch.unit.append(unit_code)
+            batch.status.append(batch.NONE)
+        return batch
+
+    def transform(
+        self,
+        stage: TransformStage,
+        max_records: Optional[int] = None,
+    ) -> ColumnarBatch:
+        return stage.process_columnar(self.to_columnar(max_records))
+
+
+_StatsDelta = Tuple[
+    Dict[str, int], Dict[str, float], Dict[str, LatencyHistogram]
+]
+_ChunkResult = Tuple[List[Any], _StatsDelta, Optional[_StatsDelta]]
+_WORKER: Dict[str, Optional[ProcessingPipeline]] = {}
+
+
+def _take_delta(pipeline: ProcessingPipeline) -> _StatsDelta:
+    delta = (
+        dict(pipeline.stats),
+        dict(pipeline.stage_time),
+        dict(pipeline.stage_latency),
+    )
+    pipeline.stats.clear()
+    pipeline.stage_time.clear()
+    pipeline.stage_latency.clear()
+    return delta
+
+
+def _init_worker(
+    pipeline: ProcessingPipeline,
+    backup: Optional[ProcessingPipeline],
+) -> None:
+    # The pickled copies carry the parent's counters; start from zero so
+    # the deltas sent back can be merged without double counting.
+    for pipe in (pipeline, backup):
+        if pipe is not None:
+            _take_delta(pipe)
+    _WORKER["pipeline"] = pipeline
+    _WORKER["backup"] = backup
+
+
+def _run_worker_chunk(chunk: List[Any]) -> _ChunkResult:
+    pipeline = _WORKER["pipeline"]
+    backup = _WORKER["backup"]
+    if pipeline is None:
+        raise RuntimeError("Worker was not initialised with a pipeline")
+
+    results = pipeline.process_batch(chunk)
+    backup_delta: Optional[_StatsDelta] = None
+    if backup is not None:
+        failed = [i for i, r in enumerate(results) if isinstance(r, Exception)]
+        if failed:
+            retried = backup.process_batch([chunk[i] for i in failed])
+            for i, value in zip(failed, retried):
+                results[i] = value
+        backup_delta = _take_delta(backup)
+
+    return results, _take_delta(pipeline), backup_delta
+
+
+def _stable_hash(key: str) -> int:
+    # hash() is salted per process; shards need the same answer everywhere.
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class HashRing:
+    def __init__(self, nodes: Iterable[int], replicas: int = 64) -> None:
+        if replicas < 1:
+            raise ValueError("replicas must be >= 1")
+        points = sorted(
+            (_stable_hash(f"{node}:{replica}"), node)
+            for node in nodes
+            for replica in range(replicas)
+        )
+        if not points:
+            raise ValueError("HashRing needs at least one node")
+        self._points = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def node_for(self, key: str) -> int:
+        index = bisect.bisect(self._points, _stable_hash(key))
+        return self._owners[index % len(self._owners)]
+
+
+def _shard_main(
+    shard: int,
+    pipeline: ProcessingPipeline,
+    inbox: multiprocessing.Queue[Any],
+    outbox: multiprocessing.Queue[Any],
+) -> None:
+    # Like _init_worker: the copy must not report the parent's counters.
+    _take_delta(pipeline)
+    pipeline.stage_drops.clear()
+    while True:
+        message = inbox.get()
+        if message is None:
+            outbox.put(("stats", shard, pipeline.get_stats()))
+            outbox.put(("stopped", shard, None))
+            return
+        if message[0] == "stats":
+            outbox.put(("stats", shard, pipeline.get_stats()))
+            continue
+
+        results: List[Tuple[int, Any]] = []
+        for seq, record in message[1]:
+            try:
+                out = pipeline.process(record)
+            except Exception as exc:
+                out = exc
+            results.append((seq, out))
+        outbox.put(("results", shard, results))
+
+
+class ShardedPipeline:
+    def __init__(
+        self,
+        pipeline: ProcessingPipeline,
+        shards: int = 4,
+        key: Union[str, Callable[[Any], Any]] = "sensor",
+        replicas: int = 64,
+        batch_size: int = 64,
+    ) -> None:
+        if shards < 1 or batch_size < 1:
+            raise ValueError("shards and batch_size must be >= 1")
+        self.pipeline_id = pipeline.pipeline_id
+        self.key = key
+        self.batch_size = batch_size
+        if isinstance(key, str):
+            # Pulls a plain string "key": "value" out of a flat raw JSON
+            # payload without parsing it; the shard does the real parse.
+            pattern = rf'"{re.escape(key)}"\s*:\s*"([^"\\]*)"'
+            self._key_text = re.compile(pattern)
+            self._key_bytes = re.compile(pattern.encode("utf-8"))
+        self.ring = HashRing(range(shards), replicas)
+        ctx = multiprocessing.get_context()
+        self.inboxes: List[multiprocessing.Queue[Any]] = [
+            ctx.Queue() for _ in range(shards)
+        ]
+        self.results: multiprocessing.Queue[Any] = ctx.Queue()
+        self.workers = [
+            ctx.Process(
+                target=_shard_main,
+                args=(shard, pipeline, self.inboxes[shard], self.results),
+                daemon=True,
+            )
+            for shard in range(shards)
+        ]
+        self.shard_stats: Dict[int, Dict[str, Any]] = {}
+        self.routed: Counter[int] = Counter()
+        self._outgoing: List[List[Tuple[int, Any]]] = [
+            [] for _ in range(shards)
+        ]
+        self._pending: Dict[int, Any] = {}
+        self._seq = 0
+        self._closed = False
+        for worker in self.workers:
+            worker.start()
+
+    def __enter__(self) -> ShardedPipeline:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _route_key(self, record: Any) -> str:
+        if callable(self.key):
+            return str(self.key(record))
+        if isinstance(record, dict):
+            return str(record.get(self.key, ""))
+        if isinstance(record, (str, bytes, bytearray)):
+            quick = self._quick_key(record)
+            if quick is not None:
+                return quick
+            try:
+                parsed = json.loads(record)
+            except ValueError:
+                # The shard reports the bad payload; any shard will do.
+                return ""
+            if isinstance(parsed, dict):
+                return str(parsed.get(self.key, ""))
+            return ""
+        return str(record)
+
+    def _quick_key(
+        self,
+        record: Union[str, bytes, bytearray],
+    ) -> Optional[str]:
+        # Only a single-object payload is safe to scan: with nesting the
+        # first match may not be the top-level key. Non-string or escaped
+        # values need json's own rendering, so they are parsed too.
+        if isinstance(record, str):
+            if record.count("{") != 1:
+                return None
+            text = self._key_text.search(record)
+            if text is None:
+                return None if f'"{self.key}"' in record else ""
+            return text.group(1)
+        if record.count(b"{") != 1:
+            return None
+        raw = self._key_bytes.search(record)
+        if raw is None:
+            return None if f'"{self.key}"'.encode() in record else ""
+        return raw.group(1).decode("utf-8", "replace")
+
+    def submit(self, record: Any) -> int:
+        if self._closed:
+            raise RuntimeError("ShardedPipeline is closed")
+        shard = self.ring.node_for(self._route_key(record))
+        seq = self._seq
+        self._seq += 1
+        self.routed[shard] += 1
+        outgoing = self._outgoing[shard]
+        outgoing.append((seq, record))
+        if len(outgoing) >= self.batch_size:
+            self._send(shard)
+        return seq
+
+    def _send(self, shard: int) -> None:
+        outgoing = self._outgoing[shard]
+        if outgoing:
+            self.inboxes[shard].put(("records", outgoing))
+            self._outgoing[shard] = []
+
+    def flush(self) -> None:
+        for shard in range(len(self.inboxes)):
+            self._send(shard)
+
+    def _collect(self) -> Tuple[str, int, Any]:
+        while True:
+            try:
+                kind, ident, body = self.results.get(timeout=0.5)
+                break
+            except queue.Empty:
+                if not all(worker.is_alive() for worker in self.workers):
+                    raise RuntimeError("A shard worker exited unexpectedly")
+        if kind == "results":
+            self._pending.update(body)
+        elif kind == "stats":
+            self.shard_stats[ident] = body
+        return kind, ident, body
+
+    def result(self, seq: int) -> Any:
+        if seq not in self._pending:
+            self.flush()
+        while seq not in self._pending:
+            self._collect()
+        return self._pending.pop(seq)
+
+    def map(self, records: Iterable[Any]) -> List[Any]:
+        return [self.result(seq) for seq in [self.submit(r) for r in records]]
+
+    def refresh_stats(self) -> Dict[str, Any]:
+        waiting = set(range(len(self.workers)))
+        self.flush()
+        for inbox in self.inboxes:
+            inbox.put(("stats",))
+        while waiting:
+            kind, shard, _ = self._collect()
+            if kind == "stats":
+                waiting.discard(shard)
+        return self.get_stats()
+
+    def get_stats(self) -> Dict[str, Any]:
+        processed = sum(st["processed"] for st in self.shard_stats.values())
+        errors = sum(st["errors"] for st in self.shard_stats.values())
+        return {
+            "pipeline_id": self.pipeline_id,
+            "processed": processed,
+            "errors": errors,
+            "routed": dict(self.routed),
+            "shards": dict(self.shard_stats),
+        }
+
+    def close(self) -> Dict[str, Any]:
+        if self._closed:
+            return self.get_stats()
+        self.flush()
+        self._closed = True
+        for inbox in self.inboxes:
+            inbox.put(None)
+        stopped = 0
+        while stopped < len(self.workers):
+            kind, _, _ = self._collect()
+            if kind == "stopped":
+                stopped += 1
+        for worker in self.workers:
+            worker.join()
+        return self.get_stats()
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        window_s: float = 10.0,
+        reset_timeout_s: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be >= 1")
+        self.failure_threshold = failure_threshold
+        self.window_s = window_s
+        self.reset_timeout_s = reset_timeout_s
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures: Deque[float] = deque()
+        self.opened_at = 0.0
+        self.trips = 0
+        self.short_circuits = 0
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if self.clock() - self.opened_at < self.reset_timeout_s:
+                self.short_circuits += 1
+                return False
+            self.state = self.HALF_OPEN
+        return True
+
+    def record_success(self) -> None:
+        if self.state == self.HALF_OPEN:
+            self.state = self.CLOSED
+            self.failures.clear()
+
+    def record_failure(self) -> None:
+        now = self.clock()
+        if self.state == self.HALF_OPEN:
+            self._trip(now)
+            return
+
+        self.failures.append(now)
+        while self.failures and now - self.failures[0] > self.window_s:
+            self.failures.popleft()
+        if len(self.failures) >= self.failure_threshold:
+            self._trip(now)
+
+    def snapshot(self) -> Dict[str, Union[str, int]]:
+        return {
+            "state": self.state,
+            "trips": self.trips,
+            "short_circuits": self.short_circuits,
+            "recent_failures": len(self.failures),
+        }
+
+    def _trip(self, now: float) -> None:
+        self.state = self.OPEN
+        self.opened_at = now
+        self.trips += 1
+        self.failures.clear()
+
+
+_BYTES_TAG = "__nexus_bytes__"
+
+
+class DeadLetterQueue:
+    def __init__(
+        self,
+        max_memory: int = 1000,
+        spill_path: Optional[Union[str, os.PathLike[str]]] = None,
+    ) -> None:
+        if max_memory < 1:
+            raise ValueError("max_memory must be >= 1")
+        self.max_memory = max_memory
+        self.spill_path = spill_path
+        self.entries: Deque[Dict[str, Any]] = deque()
+        self.spilled = 0
+        self.stats: Counter[str] = Counter()
+        # Shared by every pipeline of a manager, possibly from several
+        # FairScheduler workers at once.
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries) + self.spilled
+
+    def put(
+        self,
+        pipeline_id: str,
+        data: Any,
+        exc: BaseException,
+        default_stage: str = "unknown",
+    ) -> None:
+        cause = exc.__cause__ or exc
+        entry = {
+            "pipeline_id": pipeline_id,
+            "stage": _failed_stage(exc) or default_stage,
+            "error": f"{type(cause).__name__}: {cause}",
+            "input": data,
+            "failed_at": time.time(),
+        }
+        with self._lock:
+            self.stats["captured"] += 1
+            # Memory keeps the oldest entries; newer ones overflow to disk.
+            if len(self.entries) < self.max_memory and not self.spilled:
+                self.entries.append(entry)
+            elif not self._spill(entry):
+                # Inputs JSON cannot carry stay in memory rather than being
+                # replayed as something else.
+                self.entries.append(entry)
+                self.stats["unspillable"] += 1
+
+    def _spill(self, entry: Dict[str, Any]) -> bool:
+        data = entry["input"]
+        if isinstance(data, (bytes, bytearray)):
+            encoded = base64.b64encode(data).decode("ascii")
+            entry = {**entry, "input": {_BYTES_TAG: encoded}}
+        try:
+            line = json.dumps(entry)
+        except (TypeError, ValueError):
+            return False
+
+        if self.spill_path is None:
+            fd, self.spill_path = tempfile.mkstemp(
+                prefix="nexus_dlq_", suffix=".ndjson"
+            )
+            os.close(fd)
+        with open(self.spill_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        self.spilled += 1
+        self.stats["spilled"] += 1
+        return True
+
+    @staticmethod
+    def _unspill(line: str) -> Dict[str, Any]:
+        entry = json.loads(line)
+        data = entry["input"]
+        if isinstance(data, dict) and list(data) == [_BYTES_TAG]:
+            entry["input"] = base64.b64decode(data[_BYTES_TAG])
+        return entry
+
+    def drain(self) -> Iterator[Dict[str, Any]]:
+        entries, self.entries = self.entries, deque()
+        spill_path, spilled = self.spill_path, self.spilled
+        replay_path = None
+        if spilled and spill_path is not None:
+            # Move the spill file aside so re-failures start a fresh one.
+            replay_path = f"{os.fspath(spill_path)}.replay"
+            os.replace(spill_path, replay_path)
+            self.spilled = 0
+
+        while entries:
+            yield entries.popleft()
+        if replay_path is not None:
+            try:
+                with open(replay_path, encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            yield self._unspill(line)
+            finally:
+                os.remove(replay_path)
+
+    def replay(
+        self,
+        target: Union[ProcessingPipeline, Callable[[Any], Any]],
+    ) -> Dict[str, int]:
+        process = (
+            target.process if isinstance(target, ProcessingPipeline)
+            else target
+        )
+        report = {"replayed": 0, "recovered": 0, "failed": 0}
+        for entry in self.drain():
+            report["replayed"] += 1
+            try:
+                # Stages mutate records; a re-failure must keep the original.
+                process(_detach(entry["input"]))
+            except Exception as exc:
+                report["failed"] += 1
+                self.put(
+                    entry["pipeline_id"], entry["input"], exc, entry["stage"]
+                )
+            else:
+                report["recovered"] += 1
+        self.stats["replayed"] += report["replayed"]
+        self.stats["recovered"] += report["recovered"]
+        return report
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "in_memory": len(self.entries),
+            "spilled": self.spilled,
+            "captured": int(self.stats.get("captured", 0)),
+            "replayed": int(self.stats.get("replayed", 0)),
+            "recovered": int(self.stats.get("recovered", 0)),
+            "unspillable": int(self.stats.get("unspillable", 0)),
+        }
+
+
 class NexusManager:
-    def __init__(self, capacity_per_sec: int = 1000) -> None:
+    LANE_WEIGHTS: Dict[str, float] = {"high": 8.0, "normal": 4.0, "low": 1.0}
+
+    def __init__(
+        self,
+        capacity_per_sec: int = 1000,
+        failure_threshold: int = 5,
+        failure_window_s: float = 10.0,
+        reset_timeout_s: float = 5.0,
+        dead_letters: Optional[DeadLetterQueue] = None,
+        lane_weights: Optional[Dict[str, float]] = None,
+    ) -> None:
         self.capacity_per_sec = capacity_per_sec
+        self.dead_letters = dead_letters
         self.pipelines: Dict[str, ProcessingPipeline] = {}
         self.backups: Dict[str, ProcessingPipeline] = {}
-
-    def register(self, pipeline: ProcessingPipeline) -> None:
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.failure_threshold = failure_threshold
+        self.failure_window_s = failure_window_s
+        self.reset_timeout_s = reset_timeout_s
+        self.lane_weights = dict(lane_weights or self.LANE_WEIGHTS)
+        if any(weight <= 0 for weight in self.lane_weights.values()):
+            raise ValueError("lane weights must be > 0")
+        self.priorities: Dict[str, str] = {}
+
+    def register(
+        self,
+        pipeline: ProcessingPipeline,
+        priority: str = "normal",
+    ) -> None:
         self.pipelines[pipeline.pipeline_id] = pipeline
+        self.breakers[pipeline.pipeline_id] = CircuitBreaker(
+            self.failure_threshold,
+            self.failure_window_s,
+            self.reset_timeout_s,
+        )
+        self.set_priority(pipeline.pipeline_id, priority)
+
+    def set_priority(self, pipeline_id: str, lane: str) -> None:
+        if pipeline_id not in self.pipelines:
+            raise KeyError(f"Unknown pipeline: {pipeline_id}")
+        if lane not in self.lane_weights:
+            raise ValueError(f"Unknown priority lane: {lane}")
+        self.priorities[pipeline_id] = lane
 
     def register_backup(self, pipeline_id: str, backup: ProcessingPipeline) -> None: # noqa
         self.backups[pipeline_id] = backup
 
     def execute(self, pipeline_id: str, data: Any) -> Any:
+        out = self._execute_or_capture(pipeline_id, data, self._snapshot(data))
+        return None if out is _MISSING else out
+
+    def _snapshot(self, data: Any) -> Any:
+        # Adapters mutate their input; dead letters keep what was sent.
+        return _detach(data) if self.dead_letters is not None else None
+
+    def _execute_or_capture(
+        self,
+        pipeline_id: str,
+        data: Any,
+        snapshot: Any,
+    ) -> Any:
         if pipeline_id not in self.pipelines:
             raise KeyError(f"Unknown pipeline: {pipeline_id}")
+        if self.dead_letters is None:
+            return self._execute(pipeline_id, data)
 
-        pipeline = self.pipelines[pipeline_id]
         try:
+            return self._execute(pipeline_id, data)
+        except Exception as exc:
+            stage = self.pipelines[pipeline_id].__class__.__name__
+            self.dead_letters.put(pipeline_id, snapshot, exc, stage)
+            return _MISSING
+
+    def replay_dead_letters(self, pipeline_id: str) -> Dict[str, int]:
+        if self.dead_letters is None:
+            raise RuntimeError("NexusManager has no dead-letter queue")
+        if pipeline_id not in self.pipelines:
+            raise KeyError(f"Unknown pipeline: {pipeline_id}")
+        return self.dead_letters.replay(
+            lambda data: self._execute(pipeline_id, data)
+        )
+
+    def _execute(self, pipeline_id: str, data: Any) -> Any:
+        pipeline = self.pipelines[pipeline_id]
+        breaker = self.breakers[pipeline_id]
+        backup = self.backups.get(pipeline_id)
+        # Without a backup there is nothing to fail over to.
+        if backup is None:
             return pipeline.process(data)
+
+        if not breaker.allow():
+            return backup.process(data)
+
+        try:
+            out = pipeline.process(data)
         except Exception:
-            backup = self.backups.get(pipeline_id)
-            if backup is None:
-                raise
+            breaker.record_failure()
             print("Recovery initiated: Switching to backup processor")
             return backup.process(data)
 
+        breaker.record_success()
+        return out
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        stats: Dict[str, Dict[str, Any]] = {}
+        for pipeline_id, pipeline in self.pipelines.items():
+            entry = pipeline.get_stats()
+            entry["circuit"] = self.breakers[pipeline_id].snapshot()
+            backup = self.backups.get(pipeline_id)
+            if backup is not None:
+                entry["backup"] = backup.get_stats()
+            stats[pipeline_id] = entry
+        return stats
+
+    def execute_many(
+        self,
+        pipeline_id: str,
+        records: Iterable[Any],
+        workers: int = 2,
+        chunksize: int = 256,
+    ) -> List[Any]:
+        if pipeline_id not in self.pipelines:
+            raise KeyError(f"Unknown pipeline: {pipeline_id}")
+        if workers < 1 or chunksize < 1:
+            raise ValueError("workers and chunksize must be >= 1")
+
+        pipeline = self.pipelines[pipeline_id]
+        backup = self.backups.get(pipeline_id)
+        results: List[Any] = []
+        pending: Deque[Future[_ChunkResult]] = deque()
+        it = iter(records)
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(pipeline, backup),
+        ) as pool:
+            while True:
+                while len(pending) < workers * 2:
+                    chunk = list(islice(it, chunksize))
+                    if not chunk:
+                        break
+                    pending.append(pool.submit(_run_worker_chunk, chunk))
+                if not pending:
+                    break
+
+                out, primary_delta, backup_delta = pending.popleft().result()
+                results.extend(out)
+                pipeline.merge_stats(*primary_delta)
+                if backup is not None and backup_delta is not None:
+                    backup.merge_stats(*backup_delta)
+
+        return results
+
+    def micro_batcher(
+        self,
+        pipeline_id: str,
+        max_batch: int = 64,
+        max_delay_ms: float = 5.0,
+    ) -> MicroBatchScheduler:
+        return MicroBatchScheduler(self, pipeline_id, max_batch, max_delay_ms)
+
+    def fair_scheduler(self, workers: int = 1) -> FairScheduler:
+        return FairScheduler(self, workers)
+
+    def shard(
+        self,
+        pipeline_id: str,
+        shards: int = 4,
+        key: Union[str, Callable[[Any], Any]] = "sensor",
+        batch_size: int = 64,
+    ) -> ShardedPipeline:
+        if pipeline_id not in self.pipelines:
+            raise KeyError(f"Unknown pipeline: {pipeline_id}")
+        return ShardedPipeline(
+            self.pipelines[pipeline_id], shards, key, batch_size=batch_size
+        )
+
     def chain(self, pipeline_ids: List[str], data: Any) -> Any:
         current = data
         for pid in pipeline_ids:
+            snapshot = self._snapshot(current)
+            if isinstance(snapshot, dict) and isinstance(snapshot.get("meta"), dict): # noqa
+                snapshot["meta"].pop("chaining", None)
             if isinstance(current, dict):
                 current.setdefault("meta", {})
                 if isinstance(current["meta"], dict):
                     current["meta"]["chaining"] = True
 
-            current = self.execute(pid, current)
+            current = self._execute_or_capture(pid, current, snapshot)
+            if current is _MISSING:
+                # Dead-lettered: later steps would only see a bogus input.
+                return None
 
         if isinstance(current, dict) and isinstance(current.get("meta"), dict):
             current["meta"].pop("chaining", None)
@@ -299,6 +3063,405 @@ class NexusManager:
         return OutputStage().process(current)
 
 
+_Pending = Tuple[Any, "Future[Any]", float]
+
+
+class MicroBatchScheduler:
+    # Submissions are buffered and flushed by one background thread, so
+    # batches reach the pipeline in submission order.
+    def __init__(
+        self,
+        manager: NexusManager,
+        pipeline_id: str,
+        max_batch: int = 64,
+        max_delay_ms: float = 5.0,
+    ) -> None:
+        if pipeline_id not in manager.pipelines:
+            raise KeyError(f"Unknown pipeline: {pipeline_id}")
+        if max_batch < 1 or max_delay_ms <= 0:
+            raise ValueError("max_batch must be >= 1 and max_delay_ms > 0")
+        self.pipeline = manager.pipelines[pipeline_id]
+        self.backup = manager.backups.get(pipeline_id)
+        self.max_batch = max_batch
+        self.max_delay_s = max_delay_ms / 1000.0
+        self.stats: Counter[str] = Counter()
+        self.fill_total = 0.0
+        self.queue_delay = LatencyHistogram()
+        self._buffer: List[_Pending] = []
+        self._deadline: Optional[float] = None
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> MicroBatchScheduler:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def submit(self, record: Any) -> Future[Any]:
+        future: Future[Any] = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MicroBatchScheduler is closed")
+            now = time.monotonic()
+            if not self._buffer:
+                self._deadline = now + self.max_delay_s
+            self._buffer.append((record, future, now))
+            if len(self._buffer) == 1 or len(self._buffer) >= self.max_batch:
+                self._cond.notify()
+        return future
+
+    def _run(self) -> None:
+        with self._cond:
+            while True:
+                if self._buffer:
+                    full = len(self._buffer) >= self.max_batch
+                    remaining = 0.0
+                    if not full and self._deadline is not None:
+                        remaining = self._deadline - time.monotonic()
+                    if full or remaining <= 0 or self._closed:
+                        reason = "size" if full else (
+                            "deadline" if remaining <= 0 else "close"
+                        )
+                        batch = self._buffer[:self.max_batch]
+                        del self._buffer[:self.max_batch]
+                        if self._buffer:
+                            oldest = self._buffer[0][2]
+                            self._deadline = oldest + self.max_delay_s
+                        self._cond.release()
+                        try:
+                            self._flush(batch, reason)
+                        finally:
+                            self._cond.acquire()
+                        continue
+                    self._cond.wait(remaining)
+                elif self._closed:
+                    return
+                else:
+                    self._cond.wait()
+
+    def _flush(self, batch: List[_Pending], reason: str) -> None:
+        now = time.monotonic()
+        for _, _, queued_at in batch:
+            self.queue_delay.record(now - queued_at)
+        self.stats["batches"] += 1
+        self.stats["records"] += len(batch)
+        self.stats[f"{reason}_flushes"] += 1
+        self.fill_total += len(batch) / self.max_batch
+
+        records = [record for record, _, _ in batch]
+        try:
+            results = self.pipeline.process_batch(records)
+            if self.backup is not None:
+                failed = [
+                    i for i, value in enumerate(results)
+                    if isinstance(value, Exception)
+                ]
+                if failed:
+                    retried = self.backup.process_batch(
+                        [records[i] for i in failed]
+                    )
+                    for i, value in zip(failed, retried):
+                        results[i] = value
+        except Exception as exc:
+            for _, future, _ in batch:
+                future.set_exception(exc)
+            return
+
+        for (_, future, _), value in zip(batch, results):
+            if isinstance(value, Exception):
+                future.set_exception(value)
+            else:
+                future.set_result(value)
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        batches = int(self.stats.get("batches", 0))
+        return {
+            "batches": batches,
+            "records": int(self.stats.get("records", 0)),
+            "size_flushes": int(self.stats.get("size_flushes", 0)),
+            "deadline_flushes": int(self.stats.get("deadline_flushes", 0)),
+            "close_flushes": int(self.stats.get("close_flushes", 0)),
+            "fill_ratio": self.fill_total / batches if batches else 0.0,
+            "queue_delay": self.queue_delay.snapshot(),
+        }
+
+
+_Queued = Tuple[str, Any, "Future[Any]", float]
+
+
+class FairScheduler:
+    # Stride scheduling across priority lanes: a lane's virtual time moves
+    # 1/weight per job and the furthest-behind lane runs next, so busy
+    # lanes share throughput in proportion to their weights. Pipelines,
+    # their breakers and stats are not thread-safe, so a pipeline runs on
+    # at most one worker at a time (which also keeps its jobs in order).
+    def __init__(self, manager: NexusManager, workers: int = 1) -> None:
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.manager = manager
+        self.weights = dict(manager.lane_weights)
+        self.submitted: Counter[str] = Counter()
+        self.served: Counter[str] = Counter()
+        self.wait_time: Dict[str, LatencyHistogram] = {
+            lane: LatencyHistogram() for lane in self.weights
+        }
+        self._lanes: Dict[str, Deque[_Queued]] = {
+            lane: deque() for lane in self.weights
+        }
+        self._pass = dict.fromkeys(self.weights, 0.0)
+        self._vtime = 0.0
+        self._busy: Set[str] = set()
+        self._closed = False
+        self._cond = threading.Condition()
+        self._threads = [
+            threading.Thread(target=self._run, daemon=True)
+            for _ in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self) -> FairScheduler:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def submit(self, pipeline_id: str, data: Any) -> Future[Any]:
+        if pipeline_id not in self.manager.pipelines:
+            raise KeyError(f"Unknown pipeline: {pipeline_id}")
+        lane = self.manager.priorities.get(pipeline_id, "normal")
+        future: Future[Any] = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("FairScheduler is closed")
+            queue = self._lanes[lane]
+            if not queue:
+                # An idle lane rejoins at the current virtual time instead
+                # of cashing in the turns it skipped.
+                self._pass[lane] = max(self._pass[lane], self._vtime)
+            queue.append((pipeline_id, data, future, time.monotonic()))
+            self.submitted[lane] += 1
+            self._cond.notify()
+        return future
+
+    def _next(self) -> Optional[_Queued]:
+        ready = sorted(
+            (lane for lane, queue in self._lanes.items() if queue),
+            key=lambda n: (self._pass[n], -self.weights[n]),
+        )
+        for lane in ready:
+            queue = self._lanes[lane]
+            # First job whose pipeline is not already running elsewhere.
+            index = next(
+                (i for i, job in enumerate(queue) if job[0] not in self._busy),
+                None,
+            )
+            if index is None:
+                continue
+            job = queue[index]
+            del queue[index]
+            self._vtime = self._pass[lane]
+            self._pass[lane] += 1.0 / self.weights[lane]
+            self._busy.add(job[0])
+            self.served[lane] += 1
+            self.wait_time[lane].record(time.monotonic() - job[3])
+            return job
+        return None
+
+    def _run(self) -> None:
+        with self._cond:
+            while True:
+                job = self._next()
+                if job is None:
+                    if self._closed and not any(self._lanes.values()):
+                        return
+                    self._cond.wait()
+                    continue
+                self._cond.release()
+                try:
+                    self._execute(job)
+                finally:
+                    self._cond.acquire()
+                    self._busy.discard(job[0])
+                    # Jobs held back for this pipeline may run now.
+                    self._cond.notify_all()
+
+    def _execute(self, job: _Queued) -> None:
+        pipeline_id, data, future, _ = job
+        try:
+            out = self.manager.execute(pipeline_id, data)
+        except Exception as exc:
+            future.set_exception(exc)
+        else:
+            future.set_result(out)
+
+    def queue_depths(self) -> Dict[str, int]:
+        with self._cond:
+            return {lane: len(queue) for lane, queue in self._lanes.items()}
+
+    def close(self) -> None:
+        # Queued jobs are drained before the workers exit.
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        depths = self.queue_depths()
+        return {
+            lane: {
+                "weight": weight,
+                "depth": depths[lane],
+                "submitted": self.submitted[lane],
+                "served": self.served[lane],
+                "wait": self.wait_time[lane].snapshot(),
+            }
+            for lane, weight in self.weights.items()
+        }
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate_per_sec: float,
+        burst: Optional[float] = None,
+    ) -> None:
+        if rate_per_sec <= 0:
+            raise ValueError("rate_per_sec must be > 0")
+        self.rate = float(rate_per_sec)
+        self.capacity = float(burst) if burst is not None else self.rate
+        if self.capacity < 1.0:
+            raise ValueError("burst must allow at least one token")
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self.updated
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        # Holding the lock while sleeping keeps waiters in FIFO order.
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1.0:
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1.0
+
+
+_Job = Tuple[Any, "asyncio.Future[Any]"]
+
+
+class AsyncNexusManager(NexusManager):
+    def __init__(
+        self,
+        capacity_per_sec: int = 1000,
+        queue_size: int = 100,
+        burst: Optional[float] = None,
+        failure_threshold: int = 5,
+        failure_window_s: float = 10.0,
+        reset_timeout_s: float = 5.0,
+        dead_letters: Optional[DeadLetterQueue] = None,
+        lane_weights: Optional[Dict[str, float]] = None,
+    ) -> None:
+        super().__init__(
+            capacity_per_sec,
+            failure_threshold,
+            failure_window_s,
+            reset_timeout_s,
+            dead_letters,
+            lane_weights,
+        )
+        if queue_size < 1:
+            raise ValueError("queue_size must be >= 1")
+        self.queue_size = queue_size
+        self.limiter = TokenBucket(capacity_per_sec, burst)
+        self.queues: Dict[str, asyncio.Queue[_Job]] = {}
+        self._workers: Dict[str, asyncio.Task[None]] = {}
+
+    async def submit(
+        self,
+        pipeline_id: str,
+        data: Any,
+    ) -> asyncio.Future[Any]:
+        queue = self._queue_for(pipeline_id)
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Any] = loop.create_future()
+        # Blocks the producer while the pipeline queue is full.
+        await queue.put((data, future))
+        return future
+
+    async def process(self, pipeline_id: str, data: Any) -> Any:
+        return await (await self.submit(pipeline_id, data))
+
+    def queue_depths(self) -> Dict[str, int]:
+        return {pid: queue.qsize() for pid, queue in self.queues.items()}
+
+    async def join(self) -> None:
+        for pending in list(self.queues.values()):
+            await pending.join()
+
+    async def close(self) -> None:
+        await self.join()
+        for task in self._workers.values():
+            task.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._workers.clear()
+        self.queues.clear()
+
+    async def __aenter__(self) -> AsyncNexusManager:
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    def _queue_for(self, pipeline_id: str) -> asyncio.Queue[_Job]:
+        if pipeline_id not in self.pipelines:
+            raise KeyError(f"Unknown pipeline: {pipeline_id}")
+
+        queue = self.queues.get(pipeline_id)
+        if queue is None:
+            queue = asyncio.Queue(maxsize=self.queue_size)
+            self.queues[pipeline_id] = queue
+            self._workers[pipeline_id] = asyncio.create_task(
+                self._drain(pipeline_id, queue)
+            )
+        return queue
+
+    async def _drain(
+        self,
+        pipeline_id: str,
+        queue: asyncio.Queue[_Job],
+    ) -> None:
+        while True:
+            data, future = await queue.get()
+            try:
+                await self.limiter.acquire()
+                if future.cancelled():
+                    continue
+                try:
+                    future.set_result(self.execute(pipeline_id, data))
+                except Exception as exc:
+                    future.set_exception(exc)
+            finally:
+                queue.task_done()
+
+
 def _build_pipeline(pipeline: ProcessingPipeline) -> None:
     pipeline.add_stage(InputStage())
     pipeline.add_stage(TransformStage())
@@ -364,4 +3527,5 @@ def main() -> None:
     print("\nNexus Integration complete. All systems operational.")
 
 
-main()
+if __name__ == "__main__":
+    main()